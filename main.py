@@ -18,7 +18,7 @@ from dataclasses import asdict
 try:
     from src.api.confluence_client import ConfluenceClient
     from src.api.content_extractor import ContentExtractor
-    from src.api.auth_handler import AuthHandler
+    from src.api.auth_handler import get_auth_handler
     from src.api.page_creator import ConfluencePageCreator
     from src.ai_engine.content_analyzer import ContentAnalyzer
     from src.ai_engine.structure_optimizer import StructureOptimizer
@@ -69,7 +69,7 @@ security = HTTPBearer()
 
 # Initialize components
 try:
-    auth_handler = AuthHandler() if 'AuthHandler' in globals() else None
+    auth_handler = get_auth_handler() if 'get_auth_handler' in globals() else None
     content_extractor = ContentExtractor() if 'ContentExtractor' in globals() else None
     content_analyzer = ContentAnalyzer() if 'ContentAnalyzer' in globals() else None
     structure_optimizer = StructureOptimizer() if 'StructureOptimizer' in globals() else None
@@ -330,7 +330,7 @@ async def login(auth_request: AuthRequest):
         # Development mode
         return {"access_token": "dev_token", "token_type": "bearer"}
     
-    user = auth_handler.authenticate_user(auth_request.username, auth_request.password)
+    user = await auth_handler.authenticate_user_async(auth_request.username, auth_request.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
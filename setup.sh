@@ -41,16 +41,16 @@ check_python() {
         python_version=$(python3 --version | cut -d' ' -f2)
         print_status "Python $python_version is installed"
         
-        # Check if version is 3.9 or higher
-        python3 -c "import sys; exit(0 if sys.version_info >= (3, 9) else 1)" 2>/dev/null
+        # Check if version is 3.10 or higher
+        python3 -c "import sys; exit(0 if sys.version_info >= (3, 10) else 1)" 2>/dev/null
         if [ $? -eq 0 ]; then
-            print_status "Python version is compatible (3.9+)"
+            print_status "Python version is compatible (3.10+)"
         else
-            print_error "Python 3.9+ is required. Current version: $python_version"
+            print_error "Python 3.10+ is required. Current version: $python_version"
             exit 1
         fi
     else
-        print_error "Python 3 is not installed. Please install Python 3.9+ first."
+        print_error "Python 3 is not installed. Please install Python 3.10+ first."
         exit 1
     fi
 }
@@ -1,6 +1,7 @@
 """
 AI-powered content analysis engine
 """
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 import openai
@@ -130,6 +131,23 @@ class ContentAnalyzer:
                 confidence_score=0.0
             )
     
+    async def analyze_corpus_quality(
+        self,
+        contents: List[ContentModel],
+        max_concurrency: Optional[int] = None
+    ) -> List[AnalysisResult]:
+        """Analyze content quality for many pages with bounded concurrency"""
+        # Each page is an independent LLM round-trip, so fan them out instead of
+        # waiting on them one by one; the semaphore keeps us within rate limits
+        semaphore = asyncio.Semaphore(max_concurrency or settings.MAX_CONCURRENT_REQUESTS)
+        
+        async def analyze_bounded(content: ContentModel) -> AnalysisResult:
+            async with semaphore:
+                return await asyncio.to_thread(self.analyze_content_quality, content)
+        
+        logger.info(f"Analyzing content quality for {len(contents)} pages")
+        return list(await asyncio.gather(*(analyze_bounded(c) for c in contents)))
+    
     def extract_key_concepts(self, content: ContentModel) -> AnalysisResult:
         """Extract key concepts and topics using AI"""
         try:
@@ -203,7 +221,9 @@ class ContentAnalyzer:
     
     def _analyze_content_flow(self, text: str) -> Dict[str, Any]:
         """Analyze logical flow of content"""
-        sentences = text.split('.')
+        # Counting separators gives the same result as len(text.split('.'))
+        # without building the list of substrings
+        sentence_count = text.count('.') + 1
         
         # Simple flow analysis
         transition_words = [
@@ -211,28 +231,27 @@ class ContentAnalyzer:
             'consequently', 'meanwhile', 'nevertheless', 'moreover'
         ]
         
-        transition_count = 0
-        for word in transition_words:
-            transition_count += text.lower().count(word)
+        lowered = text.lower()
+        transition_count = sum(lowered.count(word) for word in transition_words)
         
-        flow_score = min(1.0, transition_count / max(1, len(sentences) / 10))
+        flow_score = min(1.0, transition_count / max(1, sentence_count / 10))
         
         return {
             'flow_score': flow_score,
             'transition_count': transition_count,
-            'sentence_count': len(sentences)
+            'sentence_count': sentence_count
         }
     
     def _analyze_readability(self, text: str) -> Dict[str, Any]:
         """Analyze text readability"""
         words = text.split()
-        sentences = text.split('.')
+        sentence_count = text.count('.') + 1
         
-        if not words or not sentences:
+        if not words:
             return {'readability_score': 0.0}
         
         # Simple readability metrics
-        avg_words_per_sentence = len(words) / len(sentences)
+        avg_words_per_sentence = len(words) / sentence_count
         avg_chars_per_word = sum(len(word) for word in words) / len(words)
         
         # Simple readability score (inverse of complexity)
@@ -244,7 +263,7 @@ class ContentAnalyzer:
             'avg_words_per_sentence': avg_words_per_sentence,
             'avg_chars_per_word': avg_chars_per_word,
             'total_words': len(words),
-            'total_sentences': len(sentences)
+            'total_sentences': sentence_count
         }
     
     def _ai_content_quality_analysis(self, text: str) -> Dict[str, Any]:
@@ -318,17 +337,18 @@ Provide response in JSON format."""
         """Fallback quality analysis without AI"""
         suggestions = []
         
+        word_count = len(text.split())
+        
         # Basic quality checks
-        if len(text.split()) < 100:
+        if word_count < 100:
             suggestions.append("Content appears too short - consider adding more detail")
         
-        sentences = text.split('.')
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0
+        avg_sentence_length = word_count / (text.count('.') + 1)
         
         if avg_sentence_length > 25:
             suggestions.append("Sentences are quite long - consider breaking them down for better readability")
         
-        if text.count('\n') < len(text.split()) / 50:
+        if text.count('\n') < word_count / 50:
             suggestions.append("Consider adding more paragraphs and line breaks for better structure")
         
         return {
@@ -421,14 +441,13 @@ Return a JSON object with:
         """Calculate content clarity score"""
         try:
             # Basic clarity metrics
-            sentences = text.split('.')
             words = text.split()
             
-            if not sentences or not words:
+            if not words:
                 return 0.0
             
             # Average sentence length
-            avg_sentence_length = len(words) / len(sentences)
+            avg_sentence_length = len(words) / (text.count('.') + 1)
             sentence_score = max(0, 10 - (avg_sentence_length - 15) * 0.5)  # Optimal ~15 words
             
             # Vocabulary complexity
@@ -656,27 +675,23 @@ Return a JSON object with:
         
         try:
             if self.sentence_model:
-                # Generate embeddings for each section
-                embeddings = []
-                for section in sections:
-                    content = section.get("content", "")
-                    if content.strip():
-                        embedding = self.sentence_model.encode(content)
-                        embeddings.append(embedding)
+                section_texts = [section.get("content", "") for section in sections]
+                section_texts = [content for content in section_texts if content.strip()]
                 
-                if len(embeddings) < 2:
+                if len(section_texts) < 2:
                     return 7.0
                 
-                # Calculate pairwise similarities
-                similarities = []
-                for i in range(len(embeddings) - 1):
-                    similarity = np.dot(embeddings[i], embeddings[i + 1]) / (
-                        np.linalg.norm(embeddings[i]) * np.linalg.norm(embeddings[i + 1])
-                    )
-                    similarities.append(similarity)
+                # Encode every section in one batched call
+                embeddings = self.sentence_model.encode(
+                    section_texts, batch_size=32, normalize_embeddings=True
+                )
+                
+                # Normalized embeddings make the row-wise dot product of each
+                # section with the next their cosine similarity
+                similarities = np.einsum('ij,ij->i', embeddings[:-1], embeddings[1:])
                 
                 # Convert to 0-10 scale
-                avg_similarity = np.mean(similarities)
+                avg_similarity = float(np.mean(similarities))
                 coherence_score = (avg_similarity + 1) * 5  # Convert from [-1,1] to [0,10]
                 return min(10.0, max(0.0, coherence_score))
             
@@ -1,20 +1,73 @@
 """
 Enhancement engine for content improvement
 """
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import re
+from typing import Dict, Any, List, Optional, Set, Tuple
+import httpx
 import openai
 from dataclasses import dataclass
 from datetime import datetime
 
 from ..models.content_model import ContentModel
 from ..models.enhancement_model import EnhancementModel, EnhancementType, EnhancementMetrics
+from ..utils.config import settings
+from ..utils.helpers import (
+    LRUCache, generate_hash, parse_html, parse_html_fragment, safe_json_loads, serialize_html
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on in-flight completion requests for a single page
+MAX_CONCURRENT_COMPLETIONS = 32
 
-@dataclass
+# Connection pool for the OpenAI client. HTTP/2 multiplexes concurrent
+# completions over a few warm connections instead of a TLS handshake each.
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+OPENAI_HTTP_TIMEOUT = httpx.Timeout(60.0)
+
+# Number of pages / issues whose LLM results are kept in memory
+RESULT_CACHE_SIZE = 1024
+
+# Pages shorter than this are not worth an analysis round trip
+MIN_WORDS_FOR_ANALYSIS = 200
+
+# Categories the quality analysis reports issues under
+ISSUE_CATEGORIES = ['readability', 'structure', 'clarity', 'consistency', 'completeness']
+ISSUE_PRIORITIES = ('high', 'medium', 'low')
+
+# Issue locations such as "paragraph 2" map to the Nth matching element on the page
+_ISSUE_LOCATION_RE = re.compile(r'^\s*(paragraph|section|heading|table|list)\s+(\d+)\s*$', re.IGNORECASE)
+LOCATION_SELECTORS = {
+    'paragraph': 'p',
+    'section': 'h1, h2, h3, h4, h5, h6',
+    'heading': 'h1, h2, h3, h4, h5, h6',
+    'table': 'table',
+    'list': 'ul, ol',
+}
+# Locations that cover a heading and everything under it, not a single element
+SECTION_LOCATIONS = {'section'}
+
+# Elements whose children are inline text, so an inline rewrite can go inside them
+TEXT_CONTAINER_TAGS = {'p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_HEADING_LEVELS = {f'h{level}': level for level in range(1, 7)}
+_BLOCK_TAGS = TEXT_CONTAINER_TAGS | {'div', 'ul', 'ol', 'table', 'pre', 'blockquote', 'hr'}
+
+# Appended to every rewrite prompt so the result can be spliced into the page
+HTML_FRAGMENT_INSTRUCTIONS = """Return the improved content as an HTML fragment that replaces the original element
+(for example <p>, <ul> or a complete <table>). For a section, start with its heading element.
+Do not wrap the fragment in <html> or <body> tags or in a code block."""
+
+# Shared opening of every prompt about a page. Keeping the page in an identical
+# system message lets OpenAI's prefix cache reuse it across the analysis call
+# and all enhancement calls; only the user message varies per request.
+PAGE_CONTEXT_INSTRUCTIONS = """You are a technical writing expert reviewing a Confluence page.
+Use the page below as the source material for every request about it."""
+
+
+@dataclass(slots=True)
 class Enhancement:
     """Single enhancement suggestion"""
     id: str
@@ -29,13 +82,28 @@ class Enhancement:
     metrics: EnhancementMetrics
     issues: List[str]
     recommendations: List[str]
+    target_selector: Optional[str] = None  # CSS selector for the element this enhancement rewrites
+    target_index: int = 0  # Which match of target_selector, in document order
+    target_section: bool = False  # Target is the heading plus the content under it
 
 
 class EnhancementEngine:
     """Main enhancement engine for content improvement"""
     
     def __init__(self):
-        self.openai_client = openai.OpenAI()
+        self.openai_client = openai.AsyncOpenAI(
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=OPENAI_HTTP_LIMITS,
+                timeout=OPENAI_HTTP_TIMEOUT
+            )
+        )
+        
+        # LLM results keyed by a hash of the page, so unchanged pages skip the API
+        self._analysis_cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
+        self._enhanced_content_cache = LRUCache(maxsize=RESULT_CACHE_SIZE)
+        # Hashes of pages the analysis found nothing to improve on
+        self._no_issue_hashes: Set[str] = set()
         self.enhancement_types = {
             'readability': self._enhance_readability,
             'structure': self._enhance_structure,
@@ -44,22 +112,56 @@ class EnhancementEngine:
             'completeness': self._enhance_completeness
         }
     
-    def generate_enhancements(self, content: ContentModel) -> List[Enhancement]:
+    async def generate_enhancements(self, content: ContentModel) -> List[Enhancement]:
         """Generate comprehensive content enhancements"""
         try:
             logger.info(f"Generating enhancements for: {content.title}")
             
-            enhancements = []
+            # Skip the LLM entirely for short pages and pages already known to
+            # be clean; split() stops counting once the threshold is reached
+            if len(content.raw_text.split(None, MIN_WORDS_FOR_ANALYSIS)) < MIN_WORDS_FOR_ANALYSIS:
+                logger.info(f"Skipping enhancement of short page: {content.title}")
+                return []
+            
+            content_hash = self._content_hash(content)
+            if content_hash in self._no_issue_hashes:
+                return []
             
             # Analyze content for improvement opportunities
-            analysis = self._analyze_content_quality(content)
+            analysis = await self._analyze_content_quality(content)
+            
+            issue_entries = [
+                (issue_type, issue)
+                for issue_type, issues in analysis.items()
+                for issue in issues
+            ]
+            
+            # A failed analysis comes back empty; only a successful one with
+            # no issues marks the page as clean
+            if analysis and not issue_entries:
+                self._no_issue_hashes.add(content_hash)
+                return []
+            
+            # Address every issue in one completion; any issue the batch
+            # response leaves unanswered falls back to its own request
+            batch_contents = await self._generate_enhanced_content_batch(
+                content, [issue for _, issue in issue_entries]
+            )
             
-            # Generate enhancements for each identified issue
-            for issue_type, issues in analysis.items():
-                for issue in issues:
-                    enhancement = self._create_enhancement_for_issue(content, issue_type, issue)
-                    if enhancement:
-                        enhancements.append(enhancement)
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS)
+            
+            async def create_bounded(issue_type: str, issue: Dict[str, Any],
+                                     enhanced_content: Optional[str]) -> Optional[Enhancement]:
+                async with semaphore:
+                    return await self._create_enhancement_for_issue(
+                        content, issue_type, issue, enhanced_content
+                    )
+            
+            tasks = [
+                create_bounded(issue_type, issue, batch_contents[i] or None)
+                for i, (issue_type, issue) in enumerate(issue_entries)
+            ]
+            enhancements = [e for e in await asyncio.gather(*tasks) if e]
             
             # Sort by priority and confidence
             enhancements.sort(key=lambda x: (x.priority == 'high', x.confidence), reverse=True)
@@ -70,14 +172,11 @@ class EnhancementEngine:
             logger.error(f"Failed to generate enhancements: {e}")
             return []
     
-    def _analyze_content_quality(self, content: ContentModel) -> Dict[str, List[Dict[str, Any]]]:
+    async def _analyze_content_quality(self, content: ContentModel) -> Dict[str, List[Dict[str, Any]]]:
         """Analyze content quality and identify improvement opportunities"""
         
         prompt = f"""
-        Analyze the following Confluence page content for quality issues and improvement opportunities:
-        
-        Title: {content.title}
-        Content: {content.raw_text[:4000]}  # Limit for token constraints
+        Analyze the Confluence page for quality issues and improvement opportunities.
         
         Please identify issues in these categories:
         1. Readability (complex sentences, passive voice, jargon)
@@ -87,58 +186,83 @@ class EnhancementEngine:
         5. Completeness (missing information, broken links, outdated content)
         
         For each issue found, provide:
-        - Specific location in content
+        - Specific location in content (e.g. "paragraph 2", "section 3")
         - Description of the problem
         - Suggested improvement
         - Priority level (high/medium/low)
         - Confidence score (0-1)
         
-        Return as JSON format.
+        Return a JSON object with one key per category (readability, structure, clarity,
+        consistency, completeness), each a list of objects with the keys
+        "location", "description", "suggestion", "priority" and "confidence".
         """
         
+        content_hash = self._content_hash(content)
+        cached = self._analysis_cache.get(content_hash)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
+            # Issue detection is a classification task, so it runs on the
+            # cheaper analysis model in JSON mode
+            response = await self.openai_client.chat.completions.create(
+                model=settings.OPENAI_ANALYSIS_MODEL,
+                messages=[self._page_context_message(content), {"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
                 temperature=0.3
             )
             
             # Parse response and extract issues
-            # For now, return mock data structure
-            return {
-                'readability': [
-                    {
-                        'description': 'Complex sentence structure detected',
-                        'location': 'paragraph 2',
-                        'suggestion': 'Break into shorter sentences',
-                        'priority': 'medium',
-                        'confidence': 0.8
-                    }
-                ],
-                'structure': [
-                    {
-                        'description': 'Inconsistent heading hierarchy',
-                        'location': 'section 3',
-                        'suggestion': 'Restructure headings in logical order',
-                        'priority': 'high',
-                        'confidence': 0.9
-                    }
-                ],
-                'clarity': [],
-                'consistency': [],
-                'completeness': []
-            }
+            raw_analysis = safe_json_loads(response.choices[0].message.content)
+            if not isinstance(raw_analysis, dict):
+                logger.error("Content quality analysis did not return a JSON object")
+                return {}
+            
+            analysis = self._parse_quality_issues(raw_analysis)
+            self._analysis_cache.set(content_hash, analysis)
+            return analysis
             
         except Exception as e:
             logger.error(f"Failed to analyze content quality: {e}")
             return {}
     
-    def _create_enhancement_for_issue(self, content: ContentModel, issue_type: str, issue: Dict[str, Any]) -> Optional[Enhancement]:
+    def _parse_quality_issues(self, raw_analysis: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Normalize the analysis JSON into well-formed issue lists per category"""
+        analysis = {category: [] for category in ISSUE_CATEGORIES}
+        
+        for category in ISSUE_CATEGORIES:
+            issues = raw_analysis.get(category) or []
+            if not isinstance(issues, list):
+                continue
+            
+            for issue in issues:
+                if not isinstance(issue, dict) or not issue.get('description'):
+                    continue
+                
+                priority = str(issue.get('priority', '')).lower()
+                try:
+                    confidence = min(1.0, max(0.0, float(issue.get('confidence', 0.5))))
+                except (TypeError, ValueError):
+                    confidence = 0.5
+                
+                analysis[category].append({
+                    'description': str(issue['description']),
+                    'location': str(issue.get('location', '')),
+                    'suggestion': str(issue.get('suggestion', '')),
+                    'priority': priority if priority in ISSUE_PRIORITIES else 'medium',
+                    'confidence': confidence
+                })
+        
+        return analysis
+    
+    async def _create_enhancement_for_issue(self, content: ContentModel, issue_type: str, issue: Dict[str, Any],
+                                            enhanced_content: Optional[str] = None) -> Optional[Enhancement]:
         """Create enhancement suggestion for a specific issue"""
         
         try:
-            # Generate enhanced content for the issue
-            enhanced_content = self._generate_enhanced_content(content.raw_text, issue)
+            # Generate enhanced content for the issue unless it was already batched
+            if enhanced_content is None:
+                enhanced_content = await self._generate_enhanced_content(content, issue)
             
             if not enhanced_content:
                 return None
@@ -150,6 +274,8 @@ class EnhancementEngine:
                 issue
             )
             
+            target_selector, target_index, target_section = self._resolve_issue_target(issue)
+            
             enhancement = Enhancement(
                 id=f"enh_{datetime.now().timestamp()}",
                 type=EnhancementType.CONTENT_RESTRUCTURE,  # Map issue_type to enum
@@ -162,7 +288,10 @@ class EnhancementEngine:
                 confidence=issue['confidence'],
                 metrics=metrics,
                 issues=[issue['description']],
-                recommendations=[issue['suggestion']]
+                recommendations=[issue['suggestion']],
+                target_selector=target_selector,
+                target_index=target_index,
+                target_section=target_section
             )
             
             return enhancement
@@ -171,39 +300,142 @@ class EnhancementEngine:
             logger.error(f"Failed to create enhancement for issue: {e}")
             return None
     
-    def _generate_enhanced_content(self, original_content: str, issue: Dict[str, Any]) -> str:
+    async def _generate_enhanced_content(self, content: ContentModel, issue: Dict[str, Any]) -> str:
         """Generate enhanced content for a specific issue"""
         
         prompt = f"""
-        Original content: {original_content[:2000]}
-        
         Issue: {issue['description']}
         Location: {issue['location']}
         Suggested improvement: {issue['suggestion']}
         
         Please provide an improved version of the relevant content that addresses this issue.
         Focus on the specific problem area and provide a clear, improved alternative.
+        {HTML_FRAGMENT_INSTRUCTIONS}
         """
         
+        cache_key = self._issue_cache_key(self._content_hash(content), issue)
+        cached = self._enhanced_content_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            # Stream the rewrite so long generations are bounded by the
+            # per-chunk read timeout rather than one for the whole response
+            stream = await self.openai_client.chat.completions.create(
+                model=settings.OPENAI_REWRITE_MODEL,
+                messages=[self._page_context_message(content), {"role": "user", "content": prompt}],
+                temperature=0.3,
+                stream=True
             )
             
-            return response.choices[0].message.content
+            parts = []
+            async for chunk in stream:
+                if chunk.choices:
+                    parts.append(chunk.choices[0].delta.content or '')
+            
+            enhanced_content = ''.join(parts)
+            if enhanced_content:
+                self._enhanced_content_cache.set(cache_key, enhanced_content)
+            
+            return enhanced_content
             
         except Exception as e:
             logger.error(f"Failed to generate enhanced content: {e}")
             return ""
     
+    async def _generate_enhanced_content_batch(self, content: ContentModel,
+                                               issues: List[Dict[str, Any]]) -> List[str]:
+        """Generate enhanced content for several issues with a single request"""
+        content_hash = self._content_hash(content)
+        cache_keys = [self._issue_cache_key(content_hash, issue) for issue in issues]
+        results = [self._enhanced_content_cache.get(key, "") for key in cache_keys]
+        
+        # Only ask about the issues we have no cached answer for
+        pending = [index for index, result in enumerate(results) if not result]
+        if not pending:
+            return results
+        
+        issue_list = "\n".join(
+            f"{number}. Issue: {issues[index]['description']} | Location: {issues[index]['location']} | "
+            f"Suggested improvement: {issues[index]['suggestion']}"
+            for number, index in enumerate(pending)
+        )
+        
+        prompt = f"""
+        Address all of the following issues:
+        {issue_list}
+        
+        For each issue, provide an improved version of the relevant content that addresses it.
+        {HTML_FRAGMENT_INSTRUCTIONS}
+        Return a JSON object with an "improvements" list holding one object per issue:
+        {{"improvements": [{{"index": <issue number>, "improved_content": "<improved content>"}}]}}
+        """
+        
+        try:
+            # JSON mode only guarantees an object, so the list sits under a key
+            response = await self.openai_client.chat.completions.create(
+                model=settings.OPENAI_REWRITE_MODEL,
+                messages=[self._page_context_message(content), {"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                temperature=0.3
+            )
+            
+            reply = safe_json_loads(response.choices[0].message.content)
+            improvements = reply.get('improvements') if isinstance(reply, dict) else None
+            if not isinstance(improvements, list):
+                logger.error("Batched enhancement did not return an improvements list")
+                return results
+            
+            for item in improvements:
+                if not isinstance(item, dict):
+                    continue
+                number = item.get('index')
+                improved_content = item.get('improved_content')
+                if isinstance(number, int) and 0 <= number < len(pending) and improved_content:
+                    index = pending[number]
+                    results[index] = improved_content
+                    self._enhanced_content_cache.set(cache_keys[index], improved_content)
+            
+        except Exception as e:
+            logger.error(f"Failed to generate batched enhanced content: {e}")
+        
+        return results
+    
+    def _content_hash(self, content: ContentModel) -> str:
+        """Hash everything about a page that goes into its prompts"""
+        return generate_hash(f"{content.title}\n{content.raw_text}")
+    
+    def _issue_cache_key(self, content_hash: str, issue: Dict[str, Any]) -> tuple:
+        """Cache key for the enhanced content generated for one issue on a page"""
+        return (content_hash, issue['description'], issue['location'])
+    
+    def _page_context_message(self, content: ContentModel) -> Dict[str, str]:
+        """Build the stable system message that opens every prompt about a page"""
+        return {
+            "role": "system",
+            "content": (
+                f"{PAGE_CONTEXT_INSTRUCTIONS}\n\n"
+                f"Page Title: {content.title}\n\n"
+                f"Page Content:\n{content.raw_text[:4000]}"  # Limit for token constraints
+            )
+        }
+    
+    def _resolve_issue_target(self, issue: Dict[str, Any]) -> Tuple[Optional[str], int, bool]:
+        """Map an issue location like 'paragraph 2' to a selector, match index and section flag"""
+        match = _ISSUE_LOCATION_RE.match(str(issue.get('location', '')))
+        if not match:
+            return None, 0, False
+        
+        kind = match.group(1).lower()
+        return LOCATION_SELECTORS[kind], max(0, int(match.group(2)) - 1), kind in SECTION_LOCATIONS
+    
     def _extract_relevant_content(self, full_content: str, issue: Dict[str, Any]) -> str:
         """Extract the relevant content section for the issue"""
         # Simple implementation - in practice, would use NLP to locate exact content
-        words = full_content.split()
+        # maxsplit stops scanning after the 200th word instead of tokenizing the whole page
+        words = full_content.split(None, 200)[:200]
         # Return a section around the issue location
-        return ' '.join(words[:200])  # Return first 200 words as placeholder
+        return ' '.join(words)  # Return first 200 words as placeholder
     
     def _calculate_enhancement_metrics(self, original: str, enhanced: str, issue: Dict[str, Any]) -> EnhancementMetrics:
         """Calculate metrics for the enhancement"""
@@ -252,11 +484,8 @@ class EnhancementEngine:
         try:
             logger.info(f"Applying enhancement: {enhancement.title}")
             
-            # Apply the enhancement to the content
-            enhanced_html = content.raw_html.replace(
-                enhancement.original_content,
-                enhancement.enhanced_content
-            )
+            # Apply the enhancement to the element it targets
+            enhanced_html = self._apply_to_target(content.raw_html, enhancement)
             
             # Create enhancement model
             enhancement_model = EnhancementModel(
@@ -265,6 +494,8 @@ class EnhancementEngine:
                 enhancement_type=enhancement.type,
                 title=enhancement.title,
                 description=enhancement.description,
+                before_content=content.raw_html,
+                after_content=enhanced_html,
                 original_content=enhancement.original_content,
                 enhanced_content=enhancement.enhanced_content,
                 metrics=enhancement.metrics,
@@ -280,3 +511,62 @@ class EnhancementEngine:
         except Exception as e:
             logger.error(f"Failed to apply enhancement: {e}")
             raise
+    
+    def _apply_to_target(self, html: str, enhancement: Enhancement) -> str:
+        """Swap the enhancement's target element for the enhanced content"""
+        if not enhancement.target_selector:
+            logger.warning(f"Enhancement {enhancement.id} has no target element; content left unchanged")
+            return html
+        
+        soup = parse_html(html)
+        matches = soup.select(enhancement.target_selector)
+        if enhancement.target_index >= len(matches):
+            logger.warning(f"Target element for enhancement {enhancement.id} not found; content left unchanged")
+            return html
+        
+        target = matches[enhancement.target_index]
+        new_nodes = parse_html_fragment(enhancement.enhanced_content)
+        new_tags = [node for node in new_nodes if getattr(node, 'name', None)]
+        
+        if enhancement.target_section:
+            self._replace_section(target, new_nodes, new_tags)
+        elif len(new_tags) == 1 and new_tags[0].name == target.name:
+            # The enhancement is a full replacement element
+            target.replace_with(new_tags[0])
+        elif target.name in TEXT_CONTAINER_TAGS and not any(tag.name in _BLOCK_TAGS for tag in new_tags):
+            # Inline content: keep the element and replace what is inside it
+            target.clear()
+            target.extend(new_nodes)
+        elif new_tags:
+            # Block content replaces the element as a whole
+            self._replace_nodes([target], new_nodes)
+        else:
+            logger.warning(f"Enhancement {enhancement.id} is plain text but targets a <{target.name}>; "
+                           f"content left unchanged")
+            return html
+        
+        return serialize_html(soup, html)
+    
+    def _replace_section(self, heading, new_nodes: list, new_tags: list) -> None:
+        """Replace a heading and the siblings under it, up to the next heading of the same or a higher level"""
+        level = _HEADING_LEVELS.get(heading.name, 1)
+        body = []
+        for sibling in heading.next_siblings:
+            sibling_level = _HEADING_LEVELS.get(getattr(sibling, 'name', None))
+            if sibling_level is not None and sibling_level <= level:
+                break
+            body.append(sibling)
+        
+        if new_tags and new_tags[0].name in _HEADING_LEVELS:
+            self._replace_nodes([heading] + body, new_nodes)
+        else:
+            # The rewrite is only the section body; keep the original heading
+            heading.insert_after(*new_nodes)
+            for node in body:
+                node.extract()
+    
+    def _replace_nodes(self, old_nodes: list, new_nodes: list) -> None:
+        """Put new_nodes where the run of old_nodes sits in the tree"""
+        old_nodes[0].insert_before(*new_nodes)
+        for node in old_nodes:
+            node.extract()
@@ -5,13 +5,46 @@ import logging
 from typing import Dict, Any, List, Optional
 import re
 
+from bs4 import BeautifulSoup, NavigableString, Tag
+
 from ..models.content_model import ContentModel, AnalysisResult
 from ..models.enhancement_model import EnhancementModel, EnhancementType, EnhancementMetrics
-from ..utils.helpers import clean_text
+from ..utils.helpers import clean_text, parse_html, parse_html_fragment, serialize_html
 
 
 logger = logging.getLogger(__name__)
 
+# Technology terms emphasised by _emphasize_key_terms, matched as whole words
+# in a single pass over each text node
+TECH_TERMS = ['API', 'REST', 'JSON', 'HTTP', 'HTTPS', 'SQL', 'NoSQL']
+_TECH_TERMS_RE = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, TECH_TERMS), key=len, reverse=True)) + r')\b'
+)
+
+# Text under these elements is left as-is by _emphasize_key_terms
+_NO_EMPHASIS_PARENTS = frozenset({'a', 'b', 'code', 'pre', 'script', 'strong', 'style'})
+
+# Sentence boundary: whitespace after terminal punctuation, before a capital.
+# Abbreviations followed by lowercase ("e.g. this") are not treated as breaks.
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# Headings too vague to be useful on their own
+_UNCLEAR_HEADING_RES = [
+    re.compile(r'^(this|that|here|there)\s', re.IGNORECASE),
+    re.compile(r'^(introduction|overview|details)$', re.IGNORECASE),
+]
+
+# Words that mark a paragraph as worth a callout box
+CALLOUT_INDICATORS = ['important', 'note', 'warning', 'tip', 'caution']
+_CALLOUT_RE = re.compile(r'\b(' + '|'.join(CALLOUT_INDICATORS) + r')\b', re.IGNORECASE)
+
+# Runs of characters collapsed to a single '-' when turning a heading into a TOC anchor
+_ANCHOR_RE = re.compile(r'[^a-zA-Z0-9]+')
+
+
+# Marker set on a parsed tree once its paragraphs have been split
+PARAGRAPHS_OPTIMIZED_FLAG = '_paragraphs_optimized'
+
 
 class StructureOptimizer:
     """Optimize content structure and organization"""
@@ -19,6 +52,10 @@ class StructureOptimizer:
     def __init__(self):
         pass
     
+    def builder(self, content: ContentModel) -> 'EnhancementBuilder':
+        """Start a chain of optimizations that share one parsed tree"""
+        return EnhancementBuilder(content, self)
+    
     def optimize_heading_structure(self, content: ContentModel) -> EnhancementModel:
         """Optimize heading hierarchy and structure"""
         try:
@@ -33,25 +70,9 @@ class StructureOptimizer:
                     "No headings to optimize", content.raw_html, content.raw_html, []
                 )
             
-            optimizations = []
-            optimized_html = content.raw_html
-            
-            # Fix heading hierarchy
-            fixed_headings, hierarchy_fixes = self._fix_heading_hierarchy(headings)
-            optimizations.extend(hierarchy_fixes)
-            
-            # Optimize heading text
-            heading_optimizations = self._optimize_heading_text(headings)
-            optimizations.extend(heading_optimizations)
-            
-            # Apply heading fixes to HTML
-            optimized_html = self._apply_heading_fixes(optimized_html, fixed_headings)
-            
-            # Add table of contents if content is long enough
-            if len(headings) >= 3:
-                toc_html = self._generate_table_of_contents(fixed_headings)
-                optimized_html = self._insert_table_of_contents(optimized_html, toc_html)
-                optimizations.append("Added table of contents")
+            soup = parse_html(content.raw_html)
+            optimizations = self._heading_structure_stage(soup, content)
+            optimized_html = serialize_html(soup, content.raw_html)
             
             return self._create_enhancement_result(
                 content, EnhancementType.CONTENT_RESTRUCTURE,
@@ -71,25 +92,9 @@ class StructureOptimizer:
         try:
             logger.info(f"Optimizing content flow for: {content.title}")
             
-            optimizations = []
-            optimized_html = content.raw_html
-            
-            # Add section breaks for better readability
-            optimized_html = self._add_section_breaks(optimized_html)
-            optimizations.append("Added section breaks for better readability")
-            
-            # Optimize paragraph structure
-            optimized_html = self._optimize_paragraphs(optimized_html)
-            optimizations.append("Optimized paragraph structure")
-            
-            # Add transition elements
-            optimized_html = self._add_transitions(optimized_html)
-            optimizations.append("Enhanced content flow with transitions")
-            
-            # Reorganize content sections if needed
-            reorganized_html, reorg_changes = self._reorganize_sections(optimized_html, content)
-            optimized_html = reorganized_html
-            optimizations.extend(reorg_changes)
+            soup = parse_html(content.raw_html)
+            optimizations = self._content_flow_stage(soup, content)
+            optimized_html = serialize_html(soup, content.raw_html)
             
             return self._create_enhancement_result(
                 content, EnhancementType.CONTENT_OPTIMIZATION,
@@ -109,28 +114,9 @@ class StructureOptimizer:
         try:
             logger.info(f"Enhancing readability for: {content.title}")
             
-            optimizations = []
-            optimized_html = content.raw_html
-            
-            # Break long paragraphs
-            optimized_html = self._break_long_paragraphs(optimized_html)
-            optimizations.append("Split overly long paragraphs")
-            
-            # Add emphasis to key terms
-            optimized_html = self._emphasize_key_terms(optimized_html, content)
-            optimizations.append("Added emphasis to key terms")
-            
-            # Improve list formatting
-            optimized_html = self._improve_list_formatting(optimized_html)
-            optimizations.append("Improved list formatting")
-            
-            # Add code highlighting
-            optimized_html = self._add_code_highlighting(optimized_html)
-            optimizations.append("Enhanced code formatting")
-            
-            # Add callout boxes for important information
-            optimized_html = self._add_callout_boxes(optimized_html)
-            optimizations.append("Added callout boxes for important information")
+            soup = parse_html(content.raw_html)
+            optimizations = self._readability_stage(soup, content)
+            optimized_html = serialize_html(soup, content.raw_html)
             
             return self._create_enhancement_result(
                 content, EnhancementType.CONTENT_OPTIMIZATION,
@@ -145,6 +131,82 @@ class StructureOptimizer:
                 f"Error during enhancement: {str(e)}", content.raw_html, content.raw_html, []
             )
     
+    def _heading_structure_stage(self, soup: BeautifulSoup, content: ContentModel) -> List[str]:
+        """Fix heading levels in the tree and add a table of contents"""
+        optimizations = []
+        
+        structure = content.metadata.get('structure', {})
+        headings = structure.get('headings', [])
+        
+        if not headings:
+            return optimizations
+        
+        # Fix heading hierarchy
+        fixed_headings, hierarchy_fixes = self._fix_heading_hierarchy(headings)
+        optimizations.extend(hierarchy_fixes)
+        
+        # Optimize heading text
+        heading_optimizations = self._optimize_heading_text(headings)
+        optimizations.extend(heading_optimizations)
+        
+        # Apply heading fixes to HTML
+        self._apply_heading_fixes(soup, fixed_headings)
+        
+        # Add table of contents if content is long enough
+        if len(headings) >= 3:
+            toc_html = self._generate_table_of_contents(fixed_headings)
+            self._insert_table_of_contents(soup, toc_html)
+            optimizations.append("Added table of contents")
+        
+        return optimizations
+    
+    def _content_flow_stage(self, soup: BeautifulSoup, content: ContentModel) -> List[str]:
+        """Apply the content flow optimizations to the tree"""
+        optimizations = []
+        
+        # Add section breaks for better readability
+        self._add_section_breaks(soup)
+        optimizations.append("Added section breaks for better readability")
+        
+        # Optimize paragraph structure
+        self._optimize_paragraphs(soup)
+        optimizations.append("Optimized paragraph structure")
+        
+        # Add transition elements
+        self._add_transitions(soup)
+        optimizations.append("Enhanced content flow with transitions")
+        
+        # Reorganize content sections if needed
+        optimizations.extend(self._reorganize_sections(soup, content))
+        
+        return optimizations
+    
+    def _readability_stage(self, soup: BeautifulSoup, content: ContentModel) -> List[str]:
+        """Apply the readability enhancements to the tree"""
+        optimizations = []
+        
+        # Break long paragraphs
+        self._optimize_paragraphs(soup)
+        optimizations.append("Split overly long paragraphs")
+        
+        # Add emphasis to key terms
+        self._emphasize_key_terms(soup, content)
+        optimizations.append("Added emphasis to key terms")
+        
+        # Improve list formatting
+        self._improve_list_formatting(soup)
+        optimizations.append("Improved list formatting")
+        
+        # Add code highlighting
+        self._add_code_highlighting(soup)
+        optimizations.append("Enhanced code formatting")
+        
+        # Add callout boxes for important information
+        self._add_callout_boxes(soup)
+        optimizations.append("Added callout boxes for important information")
+        
+        return optimizations
+    
     def _fix_heading_hierarchy(self, headings: List[Dict[str, Any]]) -> tuple:
         """Fix heading hierarchy issues"""
         fixed_headings = []
@@ -184,236 +246,220 @@ class StructureOptimizer:
                 optimizations.append(f"Long heading detected: '{text[:50]}...' (consider shortening)")
             
             # Check for unclear headings
-            unclear_patterns = [
-                r'^(this|that|here|there)\s',
-                r'^(introduction|overview|details)$'
-            ]
-            
-            for pattern in unclear_patterns:
-                if re.match(pattern, text, re.IGNORECASE):
+            for pattern in _UNCLEAR_HEADING_RES:
+                if pattern.match(text):
                     optimizations.append(f"Consider making heading more specific: '{text}'")
         
         return optimizations
     
-    def _apply_heading_fixes(self, html: str, fixed_headings: List[Dict[str, Any]]) -> str:
+    def _apply_heading_fixes(self, soup: BeautifulSoup, fixed_headings: List[Dict[str, Any]]) -> None:
         """Apply heading hierarchy fixes to HTML"""
-        from bs4 import BeautifulSoup
-        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Find and update headings
-            for i, heading in enumerate(fixed_headings):
-                heading_tags = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+            # Find and update headings; renaming a tag does not change its
+            # position, so one walk of the tree is enough
+            heading_tags = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+            
+            for position, heading in enumerate(fixed_headings):
+                # The extractor records each heading's document position; fall
+                # back to list order for headings that came from elsewhere
+                index = heading.get('index', position)
+                if index >= len(heading_tags):
+                    continue
                 
-                if i < len(heading_tags):
-                    old_tag = heading_tags[i]
-                    new_level = heading['level']
-                    new_tag_name = f'h{new_level}'
-                    
-                    if old_tag.name != new_tag_name:
-                        old_tag.name = new_tag_name
-            
-            return str(soup)
+                old_tag = heading_tags[index]
+                new_tag_name = f'h{heading["level"]}'
+                
+                if old_tag.name != new_tag_name:
+                    old_tag.name = new_tag_name
             
         except Exception as e:
             logger.error(f"Error applying heading fixes: {e}")
-            return html
     
     def _generate_table_of_contents(self, headings: List[Dict[str, Any]]) -> str:
         """Generate table of contents HTML"""
-        toc_html = '<div class="table-of-contents">\n'
-        toc_html += '<h2>Table of Contents</h2>\n<ul>\n'
+        parts = ['<div class="table-of-contents">\n<h2>Table of Contents</h2>\n<ul>\n']
         
         for heading in headings:
             level = heading['level']
             text = heading['text']
-            anchor = re.sub(r'[^a-zA-Z0-9\s]', '', text).replace(' ', '-').lower()
+            anchor = _ANCHOR_RE.sub('-', text).strip('-').lower()
             
             indent = '  ' * (level - 1)
-            toc_html += f'{indent}<li><a href="#{anchor}">{text}</a></li>\n'
+            parts.append(f'{indent}<li><a href="#{anchor}">{text}</a></li>\n')
         
-        toc_html += '</ul>\n</div>\n'
-        return toc_html
+        parts.append('</ul>\n</div>\n')
+        return ''.join(parts)
     
-    def _insert_table_of_contents(self, html: str, toc_html: str) -> str:
+    def _insert_table_of_contents(self, soup: BeautifulSoup, toc_html: str) -> None:
         """Insert table of contents into HTML"""
-        from bs4 import BeautifulSoup
-        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
             # Find first heading or content div
             first_heading = soup.find(['h1', 'h2', 'h3'])
             if first_heading:
-                toc_soup = BeautifulSoup(toc_html, 'html.parser')
-                first_heading.insert_before(toc_soup)
-            
-            return str(soup)
+                first_heading.insert_before(*parse_html_fragment(toc_html))
             
         except Exception as e:
             logger.error(f"Error inserting table of contents: {e}")
-            return html
     
-    def _add_section_breaks(self, html: str) -> str:
+    def _add_section_breaks(self, soup: BeautifulSoup) -> None:
         """Add visual section breaks"""
-        from bs4 import BeautifulSoup
-        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
             # Add section breaks before h2 headings
             h2_tags = soup.find_all('h2')
             for h2 in h2_tags[1:]:  # Skip first h2
                 section_break = soup.new_tag('hr', **{'class': 'section-break'})
                 h2.insert_before(section_break)
             
-            return str(soup)
-            
         except Exception as e:
             logger.error(f"Error adding section breaks: {e}")
-            return html
     
-    def _optimize_paragraphs(self, html: str) -> str:
+    def _optimize_paragraphs(self, soup: BeautifulSoup) -> None:
         """Optimize paragraph structure"""
-        from bs4 import BeautifulSoup
+        # Splitting is not idempotent, so only ever do it once per tree. Read the
+        # flag through vars(): bs4 turns unknown attribute reads into a tree search.
+        if vars(soup).get(PARAGRAPHS_OPTIMIZED_FLAG):
+            return
+        soup.__dict__[PARAGRAPHS_OPTIMIZED_FLAG] = True
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
             paragraphs = soup.find_all('p')
             for p in paragraphs:
-                text = p.get_text().strip()
+                text = p.get_text()
                 
                 # Split very long paragraphs
-                if len(text) > 500:
-                    sentences = text.split('. ')
-                    if len(sentences) > 3:
-                        # Split into multiple paragraphs
-                        mid_point = len(sentences) // 2
-                        first_half = '. '.join(sentences[:mid_point]) + '.'
-                        second_half = '. '.join(sentences[mid_point:])
-                        
-                        p.string = first_half
-                        new_p = soup.new_tag('p')
-                        new_p.string = second_half
-                        p.insert_after(new_p)
-            
-            return str(soup)
+                if len(text.strip()) > 500:
+                    boundaries = list(_SENTENCE_BOUNDARY_RE.finditer(text))
+                    if len(boundaries) >= 3:  # More than three sentences
+                        # Split into multiple paragraphs at the middle sentence break
+                        mid_point = (len(boundaries) + 1) // 2
+                        self._split_paragraph(soup, p, boundaries[mid_point - 1].start())
             
         except Exception as e:
             logger.error(f"Error optimizing paragraphs: {e}")
-            return html
     
-    def _add_transitions(self, html: str) -> str:
+    def _split_paragraph(self, soup: BeautifulSoup, p: Tag, split_at: int) -> None:
+        """Move everything after text offset split_at into a new paragraph, keeping inline markup"""
+        children = list(p.contents)
+        offset = 0
+        
+        for i, child in enumerate(children):
+            if isinstance(child, Tag):
+                child_text = child.get_text()
+            elif type(child) is NavigableString:
+                child_text = str(child)
+            else:
+                child_text = ''  # Comments and the like are not part of get_text()
+            
+            if offset + len(child_text) <= split_at:
+                offset += len(child_text)
+                continue
+            
+            moved = []
+            if type(child) is NavigableString:
+                local = split_at - offset
+                head, tail = child_text[:local], child_text[local:].lstrip()
+                child.replace_with(NavigableString(head))
+                if tail:
+                    moved.append(NavigableString(tail))
+            
+            # A break inside an inline element keeps that element whole in the first half
+            moved.extend(sibling.extract() for sibling in children[i + 1:])
+            
+            if moved:
+                new_p = soup.new_tag('p')
+                new_p.extend(moved)
+                p.insert_after(new_p)
+            return
+    
+    def _add_transitions(self, soup: BeautifulSoup) -> None:
         """Add transition elements between sections"""
         # For now, this is a placeholder
         # In a real implementation, you'd analyze content flow and add appropriate transitions
-        return html
+        pass
     
-    def _reorganize_sections(self, html: str, content: ContentModel) -> tuple:
+    def _reorganize_sections(self, soup: BeautifulSoup, content: ContentModel) -> List[str]:
         """Reorganize content sections for better flow"""
         changes = []
         
         # This is a placeholder for section reorganization logic
         # In a real implementation, you'd analyze content structure and reorder sections
         
-        return html, changes
+        return changes
     
-    def _break_long_paragraphs(self, html: str) -> str:
-        """Break overly long paragraphs"""
-        return self._optimize_paragraphs(html)  # Reuse existing logic
-    
-    def _emphasize_key_terms(self, html: str, content: ContentModel) -> str:
+    def _emphasize_key_terms(self, soup: BeautifulSoup, content: ContentModel) -> None:
         """Add emphasis to key terms"""
-        from bs4 import BeautifulSoup
-        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            # The page text is already a flat string: one scan of it tells us
+            # whether the tree needs walking at all
+            if content.raw_text and not _TECH_TERMS_RE.search(content.raw_text):
+                return
             
-            # Get key concepts from content analysis
-            structure = content.metadata.get('structure', {})
             # For now, emphasize technology terms
-            tech_terms = ['API', 'REST', 'JSON', 'HTTP', 'HTTPS', 'SQL', 'NoSQL']
-            
-            for term in tech_terms:
-                # Find and emphasize occurrences
-                for text_node in soup.find_all(text=True):
-                    if term in text_node.string:
-                        new_text = text_node.string.replace(term, f'<strong>{term}</strong>')
-                        if new_text != text_node.string:
-                            text_node.replace_with(BeautifulSoup(new_text, 'html.parser'))
-            
-            return str(soup)
+            # Only text nodes containing at least one term are visited
+            for text_node in soup.find_all(string=_TECH_TERMS_RE):
+                # Leave comments/CDATA, code and already emphasised text alone
+                if type(text_node) is not NavigableString or any(
+                    parent.name in _NO_EMPHASIS_PARENTS for parent in text_node.parents
+                ):
+                    continue
+                
+                # The capturing split alternates plain text and matched terms
+                parts = _TECH_TERMS_RE.split(str(text_node))
+                
+                new_nodes = []
+                for i, part in enumerate(parts):
+                    if i % 2:
+                        strong = soup.new_tag('strong')
+                        strong.string = part
+                        new_nodes.append(strong)
+                    elif part:
+                        new_nodes.append(NavigableString(part))
+                
+                text_node.replace_with(*new_nodes)
             
         except Exception as e:
             logger.error(f"Error emphasizing key terms: {e}")
-            return html
     
-    def _improve_list_formatting(self, html: str) -> str:
+    def _improve_list_formatting(self, soup: BeautifulSoup) -> None:
         """Improve list formatting"""
-        from bs4 import BeautifulSoup
-        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
             # Add classes to lists for better styling
             lists = soup.find_all(['ul', 'ol'])
             for list_elem in lists:
                 if not list_elem.get('class'):
                     list_elem['class'] = ['formatted-list']
             
-            return str(soup)
-            
         except Exception as e:
             logger.error(f"Error improving list formatting: {e}")
-            return html
     
-    def _add_code_highlighting(self, html: str) -> str:
+    def _add_code_highlighting(self, soup: BeautifulSoup) -> None:
         """Add syntax highlighting to code blocks"""
-        from bs4 import BeautifulSoup
-        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
             # Find code blocks and add highlighting classes
             code_blocks = soup.find_all(['code', 'pre'])
             for code in code_blocks:
                 if not code.get('class'):
                     code['class'] = ['highlighted-code']
             
-            return str(soup)
-            
         except Exception as e:
             logger.error(f"Error adding code highlighting: {e}")
-            return html
     
-    def _add_callout_boxes(self, html: str) -> str:
+    def _add_callout_boxes(self, soup: BeautifulSoup) -> None:
         """Add callout boxes for important information"""
-        from bs4 import BeautifulSoup
-        
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            
             # Look for paragraphs with important information indicators
-            important_indicators = ['important', 'note', 'warning', 'tip', 'caution']
-            
             paragraphs = soup.find_all('p')
             for p in paragraphs:
-                text = p.get_text().lower()
+                match = _CALLOUT_RE.search(p.get_text())
                 
-                for indicator in important_indicators:
-                    if indicator in text:
-                        # Wrap in callout box
-                        callout_div = soup.new_tag('div', **{'class': f'callout callout-{indicator}'})
-                        p.wrap(callout_div)
-                        break
-            
-            return str(soup)
+                if match:
+                    # Wrap in callout box
+                    indicator = match.group(1).lower()
+                    callout_div = soup.new_tag('div', **{'class': f'callout callout-{indicator}'})
+                    p.wrap(callout_div)
             
         except Exception as e:
             logger.error(f"Error adding callout boxes: {e}")
-            return html
     
     def _create_enhancement_result(self, content: ContentModel, enhancement_type: EnhancementType,
                                  description: str, before_content: str, after_content: str,
@@ -451,3 +497,58 @@ class StructureOptimizer:
             changes_summary=changes,
             metrics=metrics
         )
+
+
+class EnhancementBuilder:
+    """Chain StructureOptimizer stages over a single parsed tree
+    
+    The page is parsed once, every stage edits the same soup, and the HTML
+    is serialized only in build().
+    """
+    
+    def __init__(self, content: ContentModel, optimizer: Optional[StructureOptimizer] = None):
+        self.content = content
+        self.optimizer = optimizer or StructureOptimizer()
+        self.soup = parse_html(content.raw_html)
+        self.changes: List[str] = []
+        self.descriptions: List[str] = []
+    
+    def optimize_heading_structure(self) -> 'EnhancementBuilder':
+        """Queue heading hierarchy fixes and the table of contents"""
+        return self._run_stage(self.optimizer._heading_structure_stage,
+                               "Optimized heading structure and hierarchy")
+    
+    def optimize_content_flow(self) -> 'EnhancementBuilder':
+        """Queue content flow optimizations"""
+        return self._run_stage(self.optimizer._content_flow_stage,
+                               "Optimized content flow and organization")
+    
+    def enhance_readability(self) -> 'EnhancementBuilder':
+        """Queue readability enhancements"""
+        return self._run_stage(self.optimizer._readability_stage,
+                               "Enhanced content readability")
+    
+    def build(self, enhancement_type: EnhancementType = EnhancementType.CONTENT_OPTIMIZATION) -> EnhancementModel:
+        """Serialize the tree once and return the combined enhancement"""
+        optimized_html = serialize_html(self.soup, self.content.raw_html)
+        description = "; ".join(self.descriptions) or "No structure changes"
+        
+        return self.optimizer._create_enhancement_result(
+            self.content, enhancement_type, description,
+            self.content.raw_html, optimized_html, self.changes
+        )
+    
+    def _run_stage(self, stage, description: str) -> 'EnhancementBuilder':
+        """Run one stage against the shared tree and record its changes"""
+        try:
+            logger.info(f"Running {stage.__name__} for: {self.content.title}")
+            
+            changes = stage(self.soup, self.content)
+            if changes:
+                self.changes.extend(changes)
+                self.descriptions.append(description)
+            
+        except Exception as e:
+            logger.error(f"Error running {stage.__name__}: {e}")
+        
+        return self
@@ -1,13 +1,17 @@
 """
 Visualization engine for generating charts and interactive elements
 """
+import itertools
 import logging
+import re
+import uuid
 from typing import Dict, Any, List, Optional, Tuple
 import plotly.graph_objects as go
-import plotly.express as px
+from plotly.colors import qualitative
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
-import json
+from dataclasses import dataclass
 from datetime import datetime
 
 from ..models.visualization_model import VisualizationModel, VisualizationType, ChartConfig
@@ -16,6 +20,39 @@ from ..models.content_model import TableData
 
 logger = logging.getLogger(__name__)
 
+# Cheap screen for ISO (2024-01-31) and common (31/01/2024) date strings; only
+# columns that pass it are handed to the full datetime parser
+_DATE_RE = re.compile(r'^\d{4}[-/]\d{1,2}[-/]\d{1,2}|^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}')
+DATE_COLUMN_HINTS = ['date', 'time', 'created', 'updated', 'timestamp']
+
+# Percentages and numbered process steps mentioned in page text
+_PCT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+_STEP_RE = re.compile(r'(?:step|phase|stage)\s*\d+', re.IGNORECASE)
+
+# Line and scatter series longer than this are reduced to the min and max
+# point of each of DOWNSAMPLE_BINS bins before plotting
+DOWNSAMPLE_THRESHOLD = 1000
+DOWNSAMPLE_BINS = 250
+
+# Categorical columns with at most this many distinct values get their value
+# counts precomputed for pie/bar charts
+AGGREGATE_TOP_K = 32
+
+# Correlation heatmaps keep only this many numeric columns, chosen by
+# variance; the matrix and its payload grow with the square of the count
+HEATMAP_MAX_COLUMNS = 32
+
+@dataclass
+class TableFrame:
+    """A table's DataFrame together with its detected column types"""
+    df: pd.DataFrame
+    numeric_cols: List[str]
+    date_cols: List[str]
+    categorical_cols: List[str]
+    # Per-column 'nunique', plus min/max/mean for numeric columns and
+    # 'value_counts' for low-cardinality categorical ones
+    aggregates: Dict[str, Dict[str, Any]]
+
 
 class VisualizationEngine:
     """Generate visualizations from content data"""
@@ -32,17 +69,28 @@ class VisualizationEngine:
         }
         
         self.color_schemes = {
-            'default': px.colors.qualitative.Set3,
-            'professional': px.colors.qualitative.Plotly,
-            'vibrant': px.colors.qualitative.Bold,
-            'pastel': px.colors.qualitative.Pastel
+            'default': qualitative.Set3,
+            'professional': qualitative.Plotly,
+            'vibrant': qualitative.Bold,
+            'pastel': qualitative.Pastel
         }
+        
+        # Frames built for the tables of the page being processed, keyed by
+        # id(table); the table itself is kept alongside so the id stays valid
+        self._frame_cache: Dict[int, Tuple[TableData, TableFrame]] = {}
+        
+        # Visualization ids: a per-engine sequence plus a random suffix, so
+        # ids stay unique across engines and within the same clock tick
+        self._id_counter = itertools.count()
     
     def analyze_visualization_opportunities(self, content_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Analyze content for visualization opportunities"""
         try:
             opportunities = []
             
+            # A new page: frames from the previous one are no longer needed
+            self._frame_cache.clear()
+            
             # Analyze tables for chart potential
             if 'tables' in content_data:
                 for table in content_data['tables']:
@@ -69,8 +117,13 @@ class VisualizationEngine:
         visualizations = []
         
         try:
+            # Index the tables once; the first table wins for a repeated id
+            table_by_id = {}
+            for table in tables:
+                table_by_id.setdefault(table.table_id, table)
+            
             for suggestion in suggestions:
-                table_data = self._find_table_by_id(tables, suggestion.get('table_id'))
+                table_data = table_by_id.get(suggestion.get('table_id'))
                 if table_data:
                     viz = self._create_visualization(table_data, suggestion)
                     if viz:
@@ -81,23 +134,44 @@ class VisualizationEngine:
         except Exception as e:
             logger.error(f"Failed to generate visualizations: {e}")
             return []
+        
+        finally:
+            self._frame_cache.clear()
+    
+    def _get_frame(self, table: TableData) -> TableFrame:
+        """Build the DataFrame and column types for a table once per page"""
+        cached = self._frame_cache.get(id(table))
+        if cached is not None and cached[0] is table:
+            return cached[1]
+        
+        df = self._rows_to_df(table.headers, table.rows)
+        nunique = df.nunique()
+        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+        categorical_cols = self._detect_categorical_columns(df, nunique)
+        
+        frame = TableFrame(
+            df=df,
+            numeric_cols=numeric_cols,
+            date_cols=self._detect_date_columns(df),
+            categorical_cols=categorical_cols,
+            aggregates=self._compute_aggregates(df, nunique, numeric_cols, categorical_cols)
+        )
+        
+        self._frame_cache[id(table)] = (table, frame)
+        return frame
     
     def _analyze_table_for_charts(self, table: TableData) -> List[Dict[str, Any]]:
         """Analyze a table for chart opportunities"""
         opportunities = []
         
         try:
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(table.rows, columns=table.headers)
-            
-            # Detect numeric columns
-            numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-            
-            # Detect date/time columns
-            date_cols = self._detect_date_columns(df)
-            
-            # Detect categorical columns
-            categorical_cols = self._detect_categorical_columns(df)
+            # Convert to DataFrame and detect column types; the chart
+            # generators reuse the same frame
+            frame = self._get_frame(table)
+            df = frame.df
+            numeric_cols = frame.numeric_cols
+            date_cols = frame.date_cols
+            categorical_cols = frame.categorical_cols
             
             # Generate suggestions based on column types
             if date_cols and numeric_cols:
@@ -135,7 +209,7 @@ class VisualizationEngine:
             
             # Pie chart for categorical with small number of categories
             for cat_col in categorical_cols:
-                if df[cat_col].nunique() <= 8:
+                if frame.aggregates[cat_col]['nunique'] <= 8:
                     opportunities.append({
                         'type': 'pie_chart',
                         'table_id': table.table_id,
@@ -157,10 +231,7 @@ class VisualizationEngine:
         opportunities = []
         
         # Look for percentage mentions
-        import re
-        
-        percentage_pattern = r'(\d+(?:\.\d+)?)\s*%'
-        percentages = re.findall(percentage_pattern, text)
+        percentages = _PCT_RE.findall(text)
         
         if len(percentages) >= 3:
             opportunities.append({
@@ -172,8 +243,7 @@ class VisualizationEngine:
             })
         
         # Look for step-by-step processes
-        step_pattern = r'(?:step|phase|stage)\s*\d+'
-        steps = re.findall(step_pattern, text, re.IGNORECASE)
+        steps = _STEP_RE.findall(text)
         
         if len(steps) >= 3:
             opportunities.append({
@@ -212,10 +282,15 @@ class VisualizationEngine:
             viz_type = suggestion['type']
             
             if viz_type in self.chart_generators:
-                chart_config, chart_data = self.chart_generators[viz_type](table_data, suggestion)
+                frame = self._get_frame(table_data)
+                chart_config, chart_data = self.chart_generators[viz_type](frame, suggestion)
+                
+                metadata = {'suggestion': suggestion}
+                if viz_type == 'heatmap' and len(frame.numeric_cols) > HEATMAP_MAX_COLUMNS:
+                    metadata['heatmap_truncated'] = True
                 
                 visualization = VisualizationModel(
-                    visualization_id=f"viz_{datetime.now().timestamp()}",
+                    visualization_id=f"viz_{next(self._id_counter)}_{uuid.uuid4().hex[:8]}",
                     content_id=table_data.table_id,
                     visualization_type=VisualizationType(viz_type.upper()),
                     title=self._generate_chart_title(table_data, suggestion),
@@ -223,7 +298,7 @@ class VisualizationEngine:
                     chart_config=chart_config,
                     data=chart_data,
                     created_at=datetime.now(),
-                    metadata={'suggestion': suggestion}
+                    metadata=metadata
                 )
                 
                 return visualization
@@ -234,22 +309,33 @@ class VisualizationEngine:
             logger.error(f"Failed to create visualization: {e}")
             return None
     
-    def _create_line_chart(self, table_data: TableData, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
+    def _create_line_chart(self, frame: TableFrame, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
         """Create line chart configuration"""
         
-        df = pd.DataFrame(table_data.rows, columns=table_data.headers)
+        df = frame.df
         
         x_col = suggestion['x_column']
         y_cols = suggestion['y_columns']
         
-        fig = px.line(
-            df,
-            x=x_col,
-            y=y_cols[0] if y_cols else None,
-            title=f"{y_cols[0]} over {x_col}" if y_cols else "Line Chart"
-        )
+        # Plot each bin's extremes rather than every row of a large table
+        if y_cols and len(df) > DOWNSAMPLE_THRESHOLD:
+            x_values, y_values = self._downsample_minmax(df[x_col].to_numpy(), df[y_cols[0]].to_numpy())
+            df = pd.DataFrame({x_col: x_values, y_cols[0]: y_values})
+        
+        # Traces are built straight from column arrays; Plotly Express would
+        # copy and introspect the whole DataFrame first. WebGL traces render
+        # in one draw call instead of one SVG node per point
+        fig = go.Figure(go.Scattergl(
+            x=self._plot_values(df[x_col]),
+            y=self._column_values(df, y_cols),
+            mode='lines',
+            name=y_cols[0] if y_cols else x_col
+        ))
         
         fig.update_layout(
+            title=f"{y_cols[0]} over {x_col}" if y_cols else "Line Chart",
+            xaxis_title=x_col,
+            yaxis_title=y_cols[0] if y_cols else None,
             height=400,
             showlegend=True,
             hovermode='x unified'
@@ -264,24 +350,27 @@ class VisualizationEngine:
             responsive=True
         )
         
-        return config, json.loads(fig.to_json())
+        return config, fig.to_plotly_json()
     
-    def _create_bar_chart(self, table_data: TableData, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
+    def _create_bar_chart(self, frame: TableFrame, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
         """Create bar chart configuration"""
         
-        df = pd.DataFrame(table_data.rows, columns=table_data.headers)
+        df = frame.df
         
         x_col = suggestion['x_column']
         y_cols = suggestion['y_columns']
         
-        fig = px.bar(
-            df,
-            x=x_col,
-            y=y_cols[0] if y_cols else None,
-            title=f"{y_cols[0]} by {x_col}" if y_cols else "Bar Chart"
-        )
+        fig = go.Figure(go.Bar(
+            x=self._plot_values(df[x_col]),
+            y=self._column_values(df, y_cols)
+        ))
         
-        fig.update_layout(height=400)
+        fig.update_layout(
+            title=f"{y_cols[0]} by {x_col}" if y_cols else "Bar Chart",
+            xaxis_title=x_col,
+            yaxis_title=y_cols[0] if y_cols else None,
+            height=400
+        )
         
         config = ChartConfig(
             chart_type="bar",
@@ -292,24 +381,33 @@ class VisualizationEngine:
             responsive=True
         )
         
-        return config, json.loads(fig.to_json())
+        return config, fig.to_plotly_json()
     
-    def _create_scatter_plot(self, table_data: TableData, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
+    def _create_scatter_plot(self, frame: TableFrame, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
         """Create scatter plot configuration"""
         
-        df = pd.DataFrame(table_data.rows, columns=table_data.headers)
+        df = frame.df
         
         x_col = suggestion['x_column']
         y_cols = suggestion['y_columns']
         
-        fig = px.scatter(
-            df,
-            x=x_col,
-            y=y_cols[0] if y_cols else None,
-            title=f"{y_cols[0]} vs {x_col}" if y_cols else "Scatter Plot"
-        )
+        # Plot each bin's extremes rather than every row of a large table
+        if y_cols and len(df) > DOWNSAMPLE_THRESHOLD:
+            x_values, y_values = self._downsample_minmax(df[x_col].to_numpy(), df[y_cols[0]].to_numpy())
+            df = pd.DataFrame({x_col: x_values, y_cols[0]: y_values})
         
-        fig.update_layout(height=400)
+        fig = go.Figure(go.Scattergl(
+            x=self._plot_values(df[x_col]),
+            y=self._column_values(df, y_cols),
+            mode='markers'
+        ))
+        
+        fig.update_layout(
+            title=f"{y_cols[0]} vs {x_col}" if y_cols else "Scatter Plot",
+            xaxis_title=x_col,
+            yaxis_title=y_cols[0] if y_cols else None,
+            height=400
+        )
         
         config = ChartConfig(
             chart_type="scatter",
@@ -320,22 +418,25 @@ class VisualizationEngine:
             responsive=True
         )
         
-        return config, json.loads(fig.to_json())
+        return config, fig.to_plotly_json()
     
-    def _create_pie_chart(self, table_data: TableData, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
+    def _create_pie_chart(self, frame: TableFrame, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
         """Create pie chart configuration"""
         
-        df = pd.DataFrame(table_data.rows, columns=table_data.headers)
+        df = frame.df
         
         category_col = suggestion['category_column']
         value_col = suggestion.get('value_column')
         
         if value_col:
-            fig = px.pie(df, names=category_col, values=value_col)
+            # Plotly sums the values of repeated labels itself
+            fig = go.Figure(go.Pie(labels=df[category_col].to_numpy(), values=self._plot_values(df[value_col])))
         else:
-            # Count frequencies
-            value_counts = df[category_col].value_counts()
-            fig = px.pie(values=value_counts.values, names=value_counts.index)
+            # Count frequencies, reusing the precomputed counts when present
+            value_counts = frame.aggregates.get(category_col, {}).get('value_counts')
+            if value_counts is None:
+                value_counts = df[category_col].value_counts()
+            fig = go.Figure(go.Pie(labels=value_counts.index.to_numpy(), values=value_counts.to_numpy()))
         
         fig.update_layout(height=400)
         
@@ -348,17 +449,30 @@ class VisualizationEngine:
             responsive=True
         )
         
-        return config, json.loads(fig.to_json())
+        return config, fig.to_plotly_json()
     
-    def _create_histogram(self, table_data: TableData, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
+    def _create_histogram(self, frame: TableFrame, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
         """Create histogram configuration"""
         
-        df = pd.DataFrame(table_data.rows, columns=table_data.headers)
+        df = frame.df
         
         x_col = suggestion['x_column']
         
-        fig = px.histogram(df, x=x_col, title=f"Distribution of {x_col}")
-        fig.update_layout(height=400)
+        if x_col in frame.numeric_cols:
+            # Bin on the server so only the counts are serialized, not every value
+            values = self._plot_values(df[x_col].dropna())
+            counts, edges = np.histogram(values, bins='auto')
+            fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+            fig.update_layout(bargap=0)
+        else:
+            fig = go.Figure(go.Histogram(x=self._plot_values(df[x_col])))
+        
+        fig.update_layout(
+            title=f"Distribution of {x_col}",
+            xaxis_title=x_col,
+            yaxis_title="count",
+            height=400
+        )
         
         config = ChartConfig(
             chart_type="histogram",
@@ -369,19 +483,37 @@ class VisualizationEngine:
             responsive=True
         )
         
-        return config, json.loads(fig.to_json())
+        return config, fig.to_plotly_json()
     
-    def _create_heatmap(self, table_data: TableData, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
+    def _create_heatmap(self, frame: TableFrame, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
         """Create heatmap configuration"""
         
-        df = pd.DataFrame(table_data.rows, columns=table_data.headers)
+        df = frame.df
         
         # Calculate correlation matrix for numeric columns
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        corr_matrix = df[numeric_cols].corr()
+        labels = list(frame.numeric_cols)
+        if len(labels) > HEATMAP_MAX_COLUMNS:
+            # Keep the most variable columns, in their table order
+            keep = set(df[labels].var().nlargest(HEATMAP_MAX_COLUMNS).index)
+            labels = [col for col in labels if col in keep]
+        values = df[labels].to_numpy(dtype=np.float64, copy=False)
+        
+        if np.isnan(values).any():
+            # Missing values need pandas' pairwise-complete correlation
+            corr_matrix = df[labels].corr().to_numpy()
+        elif labels:
+            # Zero-variance columns correlate as NaN, as they do in pandas
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr_matrix = np.atleast_2d(np.corrcoef(values, rowvar=False))
+        else:
+            corr_matrix = np.empty((0, 0))
         
-        fig = px.imshow(corr_matrix, title="Correlation Heatmap")
-        fig.update_layout(height=400)
+        # Coefficients only need a few significant digits on a colour scale
+        corr_matrix = np.round(corr_matrix.astype(np.float32), 4)
+        
+        fig = go.Figure(go.Heatmap(z=corr_matrix, x=labels, y=labels, colorscale='RdBu', zmin=-1, zmax=1))
+        # Match image orientation: first variable in the top-left corner
+        fig.update_layout(title="Correlation Heatmap", height=400, yaxis_autorange='reversed')
         
         config = ChartConfig(
             chart_type="heatmap",
@@ -392,22 +524,24 @@ class VisualizationEngine:
             responsive=True
         )
         
-        return config, json.loads(fig.to_json())
+        return config, fig.to_plotly_json()
     
-    def _create_box_plot(self, table_data: TableData, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
+    def _create_box_plot(self, frame: TableFrame, suggestion: Dict[str, Any]) -> Tuple[ChartConfig, Dict[str, Any]]:
         """Create box plot configuration"""
         
-        df = pd.DataFrame(table_data.rows, columns=table_data.headers)
+        df = frame.df
         
         y_col = suggestion['y_columns'][0] if suggestion['y_columns'] else None
         x_col = suggestion.get('x_column')
         
         if x_col:
-            fig = px.box(df, x=x_col, y=y_col, title=f"Box Plot of {y_col} by {x_col}")
+            fig = go.Figure(go.Box(x=self._plot_values(df[x_col]), y=self._plot_values(df[y_col])))
+            fig.update_layout(title=f"Box Plot of {y_col} by {x_col}", xaxis_title=x_col)
         else:
-            fig = px.box(df, y=y_col, title=f"Box Plot of {y_col}")
+            fig = go.Figure(go.Box(y=self._plot_values(df[y_col])))
+            fig.update_layout(title=f"Box Plot of {y_col}")
         
-        fig.update_layout(height=400)
+        fig.update_layout(yaxis_title=y_col, height=400)
         
         config = ChartConfig(
             chart_type="box",
@@ -418,40 +552,124 @@ class VisualizationEngine:
             responsive=True
         )
         
-        return config, json.loads(fig.to_json())
+        return config, fig.to_plotly_json()
+    
+    def _column_values(self, df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        """Values of the first listed column, or the row index when none is given"""
+        return self._plot_values(df[columns[0]]) if columns else df.index.to_numpy()
+    
+    def _plot_values(self, series: pd.Series) -> np.ndarray:
+        """Column values for a trace, with floats narrowed to float32"""
+        # float32 is plenty for plotting and halves the array bytes; integers
+        # are left alone since float32 cannot hold large ones exactly
+        if pd.api.types.is_float_dtype(series.dtype):
+            return series.to_numpy(dtype=np.float32, na_value=np.nan)
+        return series.to_numpy()
+    
+    def _downsample_minmax(self, x: np.ndarray, y: np.ndarray,
+                           n_bins: int = DOWNSAMPLE_BINS) -> Tuple[np.ndarray, np.ndarray]:
+        """Reduce a series to the min and max point of each x-ordered bin"""
+        present = ~(pd.isna(x) | pd.isna(y))
+        x, y = x[present], y[present]
+        
+        if len(y) <= 2 * n_bins:
+            return x, y
+        
+        try:
+            order = np.argsort(x, kind='stable')
+        except TypeError:
+            # Mixed-type x values cannot be ordered; bin in row order
+            order = np.arange(len(x))
+        
+        kept = []
+        for bin_rows in np.array_split(order, n_bins):
+            bin_y = y[bin_rows]
+            low, high = np.argmin(bin_y), np.argmax(bin_y)
+            # Keep the two extremes in x order within the bin
+            kept.extend(bin_rows[sorted({low, high})])
+        
+        kept = np.asarray(kept)
+        return x[kept], y[kept]
+    
+    def _rows_to_df(self, headers: List[str], rows: List[List[Any]]) -> pd.DataFrame:
+        """Build a typed DataFrame from extracted table rows"""
+        df = pd.DataFrame(rows, columns=headers)
+        
+        # Extracted cells are text, so numeric columns would otherwise stay
+        # object dtype; convert each one once, here, with the vectorized parser
+        for position, dtype in enumerate(df.dtypes):
+            if not (dtype == 'object' or pd.api.types.is_string_dtype(dtype)):
+                continue
+            
+            column = df.iloc[:, position]
+            present = column.notna() & (column.astype(str).str.strip() != '')
+            if not present.any():
+                continue
+            
+            # Skip the parse for columns whose first value is plainly not a number
+            first = str(column[present].iloc[0]).strip()
+            if not (first[0].isdigit() or first[0] in '+-.'):
+                continue
+            
+            numeric = pd.to_numeric(column.where(present), errors='coerce')
+            if numeric[present].notna().all():
+                df.isetitem(position, numeric)
+        
+        return df
+    
+    def _compute_aggregates(self, df: pd.DataFrame, nunique: pd.Series,
+                            numeric_cols: List[str], categorical_cols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Compute the per-column summaries the chart generators share"""
+        aggregates = {col: {'nunique': int(nunique[col])} for col in df.columns}
+        
+        if numeric_cols:
+            stats = df[numeric_cols].agg(['min', 'max', 'mean'])
+            for col in numeric_cols:
+                aggregates[col].update(stats[col].to_dict())
+        
+        for col in categorical_cols:
+            if aggregates[col]['nunique'] <= AGGREGATE_TOP_K:
+                aggregates[col]['value_counts'] = df[col].value_counts()
+        
+        return aggregates
     
     def _detect_date_columns(self, df: pd.DataFrame) -> List[str]:
         """Detect date/time columns in DataFrame"""
         date_cols = []
         
-        for col in df.columns:
-            # Try to parse as datetime
-            try:
-                pd.to_datetime(df[col].dropna().head(10))
+        # Walk the dtypes once; a column is only materialised when its
+        # values actually need screening
+        for position, (col, dtype) in enumerate(df.dtypes.items()):
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                date_cols.append(col)
+                continue
+            
+            # Screen a sample with the regex first; the parser only runs on
+            # columns that already look like dates
+            if dtype == 'object' or pd.api.types.is_string_dtype(dtype):
+                sample = df.iloc[:, position].dropna().head(20).astype(str)
+                if len(sample) and sample.str.match(_DATE_RE).mean() >= 0.6:
+                    parsed = pd.to_datetime(sample, errors='coerce', format='mixed')
+                    if parsed.notna().mean() >= 0.8:
+                        date_cols.append(col)
+                        continue
+            
+            # Check for date-like column names
+            if any(word in str(col).lower() for word in DATE_COLUMN_HINTS):
                 date_cols.append(col)
-            except:
-                # Check for date-like column names
-                if any(word in col.lower() for word in ['date', 'time', 'created', 'updated', 'timestamp']):
-                    date_cols.append(col)
         
         return date_cols
     
-    def _detect_categorical_columns(self, df: pd.DataFrame) -> List[str]:
+    def _detect_categorical_columns(self, df: pd.DataFrame, nunique: Optional[pd.Series] = None) -> List[str]:
         """Detect categorical columns in DataFrame"""
-        categorical_cols = []
+        if nunique is None:
+            nunique = df.nunique(dropna=True)
         
-        for col in df.columns:
-            if df[col].dtype == 'object' or df[col].nunique() / len(df) < 0.1:
-                categorical_cols.append(col)
+        # Text columns, or columns with few distinct values relative to rows
+        n_rows = max(len(df), 1)
+        mask = (df.dtypes == 'object').to_numpy() | (nunique.to_numpy() / n_rows < 0.1)
         
-        return categorical_cols
-    
-    def _find_table_by_id(self, tables: List[TableData], table_id: str) -> Optional[TableData]:
-        """Find table by ID"""
-        for table in tables:
-            if table.table_id == table_id:
-                return table
-        return None
+        return df.columns[mask].tolist()
     
     def _generate_chart_title(self, table_data: TableData, suggestion: Dict[str, Any]) -> str:
         """Generate appropriate chart title"""
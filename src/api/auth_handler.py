@@ -1,10 +1,13 @@
 """
 Authentication handler for Confluence API
 """
+import asyncio
+import json
 import logging
+import time
+from functools import lru_cache
 from typing import Optional, Dict, Any
 import jwt
-from datetime import datetime, timedelta
 from passlib.context import CryptContext
 
 from ..utils.config import settings
@@ -12,15 +15,23 @@ from ..utils.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Resolving the bcrypt backend is not free, so every handler shares one context
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 
 class AuthHandler:
     """Handle authentication for Confluence API and application"""
     
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pwd_context = pwd_context
         self.secret_key = settings.SECRET_KEY
         self.algorithm = "HS256"
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        
+        # Sign and verify through a JWS instance limited to our algorithm, with
+        # the key encoded once, rather than going through jwt.encode/decode
+        self._secret_key_bytes = self.secret_key.encode('utf-8')
+        self._jws = jwt.PyJWS(algorithms=[self.algorithm])
     
     def verify_confluence_credentials(self, username: str, api_token: str) -> bool:
         """Verify Confluence API credentials"""
@@ -43,11 +54,10 @@ class AuthHandler:
         """Create JWT access token"""
         try:
             to_encode = data.copy()
-            expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
-            to_encode.update({"exp": expire})
+            to_encode["exp"] = int(time.time()) + self.access_token_expire_minutes * 60
             
-            encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-            return encoded_jwt
+            payload = json.dumps(to_encode, separators=(',', ':')).encode('utf-8')
+            return self._jws.encode(payload, self._secret_key_bytes, algorithm=self.algorithm)
             
         except Exception as e:
             logger.error(f"Error creating access token: {e}")
@@ -56,13 +66,26 @@ class AuthHandler:
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify JWT token"""
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = json.loads(
+                self._jws.decode(token, self._secret_key_bytes, algorithms=[self.algorithm])
+            )
+            if not isinstance(payload, dict):
+                raise jwt.DecodeError("Token payload is not a JSON object")
+            
+            # Only the expiry claim is checked; it is the only one we issue
+            exp = payload.get("exp")
+            if exp is not None:
+                if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+                    raise jwt.DecodeError("Expiration Time claim (exp) must be a number")
+                if exp <= time.time():
+                    raise jwt.ExpiredSignatureError("Signature has expired")
+            
             return payload
             
         except jwt.ExpiredSignatureError:
             logger.warning("Token has expired")
             return None
-        except jwt.JWTError as e:
+        except (jwt.InvalidTokenError, ValueError) as e:
             logger.error(f"JWT error: {e}")
             return None
     
@@ -74,6 +97,17 @@ class AuthHandler:
         """Verify password against hash"""
         return self.pwd_context.verify(plain_password, hashed_password)
     
+    # bcrypt is deliberately slow (~100ms); the async variants run it in a
+    # worker thread so async request handlers don't block the event loop
+    
+    async def hash_password_async(self, password: str) -> str:
+        """Hash password without blocking the event loop"""
+        return await asyncio.to_thread(self.hash_password, password)
+    
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify password against hash without blocking the event loop"""
+        return await asyncio.to_thread(self.verify_password, plain_password, hashed_password)
+    
     def authenticate_user(self, username: str, password: str) -> Optional[Dict[str, Any]]:
         """Authenticate user (placeholder for user management)"""
         # This is a placeholder - in a real application, you'd check against a user database
@@ -85,3 +119,13 @@ class AuthHandler:
                 "is_active": True
             }
         return None
+    
+    async def authenticate_user_async(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """Authenticate user off the event loop"""
+        return await asyncio.to_thread(self.authenticate_user, username, password)
+
+
+@lru_cache(maxsize=1)
+def get_auth_handler() -> AuthHandler:
+    """Process-wide AuthHandler, suitable for use as a FastAPI dependency"""
+    return AuthHandler()
@@ -1,19 +1,44 @@
 """
 Confluence API client for content extraction
 """
-import requests
+import asyncio
+import hashlib
+import httpx
 import json
+import orjson
+import re
 from typing import Dict, Any, Optional, List
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
 import logging
 
 from ..utils.config import settings
-from ..utils.helpers import clean_text, extract_table_data
+from ..utils.helpers import LRUCache, clean_text, extract_table_data, extract_text_and_headings
 
 
 logger = logging.getLogger(__name__)
 
+# Page id locations in Confluence URLs, tried in order of precedence
+_PAGE_ID_RES = (
+    re.compile(r'/pages/(\d+)/'),
+    re.compile(r'pageId=(\d+)'),
+    re.compile(r'/(\d+)$'),
+)
+
+# Keep-alive pool shared by the page fetches of one client; HTTP/2 lets
+# concurrent async fetches share a connection
+CONFLUENCE_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+CONFLUENCE_HTTP_TIMEOUT = httpx.Timeout(30.0)
+CONFLUENCE_HEADERS = {
+    'Accept': 'application/json',
+    'Content-Type': 'application/json'
+}
+PAGE_EXPAND = 'body.storage,version,space,metadata.labels'
+
+# Recent validate_connection answers, keyed by site, user and a digest of the
+# token, so repeated credential checks skip the round trip
+VALIDATION_CACHE_TTL = 60
+_VALIDATION_CACHE = LRUCache(maxsize=256, ttl=VALIDATION_CACHE_TTL)
+
 
 class ConfluenceClient:
     """Client for interacting with Confluence API"""
@@ -26,32 +51,52 @@ class ConfluenceClient:
         if not all([self.base_url, self.username, self.api_token]):
             logger.warning("Confluence credentials not fully configured")
         
-        self.session = requests.Session()
-        self.session.auth = (self.username, self.api_token)
-        self.session.headers.update({
-            'Accept': 'application/json',
-            'Content-Type': 'application/json'
-        })
+        self.session = httpx.Client(**self._client_options())
+        self._aclient: Optional[httpx.AsyncClient] = None
+    
+    def _client_options(self) -> Dict[str, Any]:
+        """Connection settings shared by the sync and async clients"""
+        return {
+            'auth': (self.username or '', self.api_token or ''),
+            'headers': CONFLUENCE_HEADERS,
+            'http2': True,
+            'limits': CONFLUENCE_HTTP_LIMITS,
+            'timeout': CONFLUENCE_HTTP_TIMEOUT,
+            'follow_redirects': True
+        }
+    
+    @property
+    def aclient(self) -> httpx.AsyncClient:
+        """Async client, created on first use"""
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(**self._client_options())
+        return self._aclient
+    
+    def close(self) -> None:
+        """Close the sync connection pool"""
+        self.session.close()
+    
+    async def aclose(self) -> None:
+        """Close both connection pools"""
+        self.session.close()
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
     
     def extract_page_id_from_url(self, page_url: str) -> Optional[str]:
         """Extract page ID from Confluence URL"""
         try:
-            import re
-            patterns = [
-                r'/pages/(\d+)/',
-                r'pageId=(\d+)',
-                r'/(\d+)$'
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, page_url)
+            for pattern in _PAGE_ID_RES:
+                match = pattern.search(page_url)
                 if match:
                     return match.group(1)
             
-            parsed = urlparse(page_url)
-            path_parts = parsed.path.split('/')
+            # Fall back to the first all-digit path segment. Dropping the query
+            # and fragment is enough; the scheme and host never split into an
+            # all-digit segment
+            path = page_url.partition('?')[0].partition('#')[0]
             
-            for part in path_parts:
+            for part in path.split('/'):
                 if part.isdigit():
                     return part
             
@@ -66,27 +111,59 @@ class ConfluenceClient:
         try:
             url = urljoin(self.base_url, f"/wiki/rest/api/content/{page_id}")
             params = {
-                'expand': 'body.storage,version,space,metadata.labels'
+                'expand': PAGE_EXPAND
             }
             
             response = self.session.get(url, params=params)
             response.raise_for_status()
             
-            return response.json()
+            # Page bodies run to megabytes; orjson decodes the raw bytes directly
+            return orjson.loads(response.content)
+            
+        except Exception as e:
+            logger.error(f"Error getting page content: {e}")
+            return {}
+    
+    async def aget_page_content(self, page_id: str) -> Dict[str, Any]:
+        """Get page content by page ID without blocking the event loop"""
+        try:
+            url = urljoin(self.base_url, f"/wiki/rest/api/content/{page_id}")
+            params = {
+                'expand': PAGE_EXPAND
+            }
+            
+            response = await self.aclient.get(url, params=params)
+            response.raise_for_status()
+            
+            return orjson.loads(response.content)
             
         except Exception as e:
             logger.error(f"Error getting page content: {e}")
             return {}
     
+    async def aget_pages_content(self, page_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch several pages concurrently, in the order given"""
+        return await asyncio.gather(*[self.aget_page_content(page_id) for page_id in page_ids])
+    
     def validate_connection(self) -> bool:
         """Validate connection to Confluence"""
+        token_digest = hashlib.blake2s((self.api_token or '').encode('utf-8')).hexdigest()
+        cache_key = (self.base_url, self.username, token_digest)
+        cached = _VALIDATION_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             url = urljoin(self.base_url, "/wiki/rest/api/space")
             response = self.session.get(url, timeout=10)
-            return response.status_code == 200
+            is_valid = response.status_code == 200
         except Exception as e:
+            # Network failures are not cached; the next check retries
             logger.error(f"Connection validation failed: {e}")
             return False
+        
+        _VALIDATION_CACHE.set(cache_key, is_valid)
+        return is_valid
 
     def get_page_content_by_url(self, page_url: str) -> Dict[str, Any]:
         """Get page content by URL (compatibility method for content extractor)"""
@@ -108,6 +185,29 @@ class ConfluenceClient:
             logger.error(f"Error getting page content by URL: {e}")
             return {}
 
+    async def aget_page_content_by_url(self, page_url: str) -> Dict[str, Any]:
+        """Get page content by URL without blocking the event loop"""
+        try:
+            page_id = self.extract_page_id_from_url(page_url)
+            if not page_id:
+                logger.error("Could not extract page ID from URL")
+                return {}
+            
+            page_data = await self.aget_page_content(page_id)
+            if not page_data:
+                logger.error("Could not fetch page content")
+                return {}
+            
+            return page_data
+            
+        except Exception as e:
+            logger.error(f"Error getting page content by URL: {e}")
+            return {}
+    
+    async def aget_pages_content_by_url(self, page_urls: List[str]) -> List[Dict[str, Any]]:
+        """Fetch several pages by URL concurrently over one connection pool, in the order given"""
+        return await asyncio.gather(*[self.aget_page_content_by_url(page_url) for page_url in page_urls])
+
     def extract_content_structure(self, raw_content):
         """Extract structured content from raw page data"""
         try:
@@ -117,8 +217,10 @@ class ConfluenceClient:
             # Extract storage content
             storage_content = raw_content.get('body', {}).get('storage', {}).get('value', '')
             
-            # Parse HTML content with BeautifulSoup
-            soup = BeautifulSoup(storage_content, 'html.parser')
+            # Only the text and heading outline are needed here, so skip building
+            # a full BeautifulSoup tree. Each heading records its position among
+            # all h1-h6 tags so later stages can map straight back to the tag
+            text, headings = extract_text_and_headings(storage_content)
             
             # Extract structured content
             structured = {
@@ -128,10 +230,10 @@ class ConfluenceClient:
                 'space_name': raw_content.get('space', {}).get('name', ''),
                 'version': raw_content.get('version', {}).get('number', 1),
                 'raw_html': storage_content,
-                'raw_text': soup.get_text(strip=True) if soup else '',
-                'text_content': soup.get_text(strip=True) if soup else '',
+                'raw_text': text,
+                'text_content': text,
                 'tables': [],
-                'headings': [],
+                'headings': headings,
                 'metadata': {
                     'created': raw_content.get('history', {}).get('createdDate', ''),
                     'modified': raw_content.get('version', {}).get('when', ''),
@@ -3,11 +3,18 @@ Enhanced Content Analysis API
 Advanced content processing with table analysis, concept extraction, and modernization capabilities.
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
 import logging
+import orjson
+import re
+import time
+import zlib
 from datetime import datetime
+from itertools import chain, count
 
 from ..processors.table_processor import TableProcessor
 from ..processors.concept_processor_enhanced import ConceptProcessor
@@ -16,10 +23,17 @@ from ..visualizations.dashboard_generator import DashboardGenerator
 from ..modernization.modernization_engine import ModernizationEngine
 from ..api.confluence_client import ConfluenceClient
 from ..ai_engine.content_analyzer import ContentAnalyzer
+from ..utils.helpers import LRUCache, parse_html
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/v1/enhanced-analysis", tags=["Enhanced Analysis"])
+# Analysis responses carry full table rows and dashboard figures; orjson
+# encodes them in one pass in C
+router = APIRouter(
+    prefix="/api/v1/enhanced-analysis",
+    tags=["Enhanced Analysis"],
+    default_response_class=ORJSONResponse
+)
 
 # Request/Response Models
 class EnhancedAnalysisRequest(BaseModel):
@@ -61,6 +75,30 @@ class EnhancedAnalysisResponse(BaseModel):
     processing_summary: Dict[str, Any]
     recommendations: List[Dict[str, Any]]
 
+# Stage results for pages with nothing to analyze; stages skip straight to
+# these when the page has no text or no tables
+EMPTY_TABLE_RESULT = {'table_count': 0, 'processed_tables': [], 'dashboard_suggestions': [], 'visualization_potential': 'none'}
+EMPTY_CONCEPT_RESULT = {
+    'identified_concepts': {},
+    'total_concept_count': 0,
+    'diagram_suggestions': [],
+    'generated_diagrams': []
+}
+EMPTY_MODERNIZATION_RESULT = {
+    'outdated_technologies': [],
+    'modernization_suggestions': [],
+    'implementation_roadmap': {},
+    'risk_assessment': {}
+}
+_TABLE_TAG_RE = re.compile(r'<table[\s>]', re.IGNORECASE)
+
+# Response models for the optional analysis sections
+_SECTION_MODELS = {
+    'table_analysis': TableAnalysisResult,
+    'concept_analysis': ConceptAnalysisResult,
+    'modernization_analysis': ModernizationAnalysisResult
+}
+
 # Initialize processors
 table_processor = TableProcessor()
 concept_processor = ConceptProcessor()
@@ -70,6 +108,94 @@ modernization_engine = ModernizationEngine()
 confluence_client = ConfluenceClient()
 content_analyzer = ContentAnalyzer()
 
+# Parsed pages by URL, so analyzing a page again with other options skips
+# the fetch and parse. Entries leave out the soup; table analysis rebuilds
+# it from the HTML
+CONTENT_CACHE_TTL = 300
+_CONTENT_CACHE = LRUCache(maxsize=256, ttl=CONTENT_CACHE_TTL)
+_CONTENT_LOCKS: Dict[str, asyncio.Lock] = {}
+# Page text and HTML run to hundreds of KB and compress several-fold, so
+# cached entries hold them compressed
+_COMPRESSED_FIELDS = ('raw_text', 'html_content')
+
+# Table visualization potential, lowest first; other values count as low
+_POTENTIAL_LEVELS = ('low', 'medium', 'high')
+_POTENTIAL_RANK = {level: rank for rank, level in enumerate(_POTENTIAL_LEVELS)}
+
+# Steps each output format leaves out, whatever the request's options say:
+# summaries carry no dashboards or diagrams, technical output no dashboards
+FORMAT_OPTION_MASKS = {
+    'comprehensive': {},
+    'summary': {'dashboard_generation': False, 'diagram_generation': False},
+    'technical': {'dashboard_generation': False}
+}
+
+# Per-process sequence numbers for analysis ids
+_ANALYSIS_SEQUENCE = count()
+
+# Analyses in progress, keyed by page, options and output format
+_RUNNING_ANALYSES: Dict[Any, asyncio.Future] = {}
+
+# Static endpoint payloads, built once. Capabilities never change, so they
+# are served as pre-encoded JSON
+_COMPLETED_STATUS = {
+    'status': 'completed',  # completed, processing, failed
+    'progress': 100,
+    'message': 'Analysis completed successfully'
+}
+_CAPABILITIES_BODY = orjson.dumps({
+    'table_analysis': {
+        'description': 'Extract and analyze table data for visualization opportunities',
+        'features': ['Data type detection', 'Pattern identification', 'Visualization suggestions', 'Dashboard generation']
+    },
+    'concept_extraction': {
+        'description': 'Identify concepts and processes suitable for diagramming',
+        'features': ['Process identification', 'Workflow extraction', 'Flowchart generation', 'Architecture diagrams']
+    },
+    'modernization_analysis': {
+        'description': 'Analyze content for technology modernization opportunities',
+        'features': ['Outdated technology detection', 'Modern alternatives', 'Implementation roadmaps', 'Risk assessment']
+    },
+    'dashboard_generation': {
+        'description': 'Create interactive dashboards from data',
+        'features': ['Multiple chart types', 'Interactive filters', 'Real-time updates', 'Export capabilities']
+    }
+})
+
+# Recommendation templates; only the description's count or level varies
+_DASHBOARD_RECOMMENDATION = {
+    'type': 'visualization',
+    'priority': 'high',
+    'title': 'Interactive Dashboards Available',
+    'description': "Generated {} interactive dashboards from your table data.",
+    'action': 'Review and embed dashboards into your Confluence page for better data presentation.',
+    'benefit': 'Improved data visualization and user engagement'
+}
+_DIAGRAM_RECOMMENDATION = {
+    'type': 'documentation',
+    'priority': 'medium',
+    'title': 'Process Diagrams Generated',
+    'description': "Identified {} processes that can be visualized as flowcharts.",
+    'action': 'Add generated flowcharts to improve process documentation clarity.',
+    'benefit': 'Enhanced process understanding and documentation quality'
+}
+_MODERNIZATION_RECOMMENDATION = {
+    'type': 'modernization',
+    'priority': 'medium',
+    'title': 'Technology Modernization Opportunities',
+    'description': "Found {} outdated technologies that should be modernized.",
+    'action': 'Review modernization roadmap and plan technology updates.',
+    'benefit': 'Improved security, performance, and maintainability'
+}
+_ENHANCEMENT_RECOMMENDATION = {
+    'type': 'content_enhancement',
+    'priority': 'medium',
+    'title': 'Content Enhancement Opportunities',
+    'description': "Your content has {} potential for interactive enhancements.",
+    'action': 'Consider adding more interactive elements and visualizations.',
+    'benefit': 'Better user experience and information accessibility'
+}
+
 @router.post("/analyze", response_model=EnhancedAnalysisResponse)
 async def enhanced_content_analysis(
     request: EnhancedAnalysisRequest,
@@ -80,84 +206,152 @@ async def enhanced_content_analysis(
     Includes table analysis, concept extraction, modernization suggestions, and visualization generation.
     """
     try:
-        analysis_id = f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # The sequence number keeps ids unique within the same clock tick
+        analysis_id = f"analysis_{time.time_ns():x}_{next(_ANALYSIS_SEQUENCE):x}"
         logger.info(f"Starting enhanced analysis {analysis_id} for URL: {request.confluence_url}")
         
-        # Step 1: Extract content from Confluence
-        logger.info("Extracting content from Confluence...")
-        content_data = await _extract_confluence_content(request.confluence_url)
-        
-        if not content_data:
-            raise HTTPException(status_code=404, detail="Could not extract content from Confluence URL")
-        
-        # Initialize response components
-        response_data = {
-            'analysis_id': analysis_id,
-            'content_metadata': {
-                'title': content_data.get('title', 'Unknown'),
-                'url': request.confluence_url,
-                'content_length': len(content_data.get('raw_text', '')),
-                'analysis_timestamp': datetime.now().isoformat(),
-                'analysis_options': request.analysis_options
-            },
-            'table_analysis': None,
-            'concept_analysis': None,
-            'modernization_analysis': None,
-            'generated_dashboards': [],
-            'processing_summary': {},
-            'recommendations': []
-        }
-        
-        # Step 2: Table Analysis and Dashboard Generation
-        if request.analysis_options.get("table_analysis", True):
-            logger.info("Performing table analysis...")
-            table_results = await _perform_table_analysis(content_data)
-            response_data['table_analysis'] = table_results
-            
-            # Generate dashboards if requested
-            if request.analysis_options.get("dashboard_generation", True) and table_results['processed_tables']:
-                logger.info("Generating interactive dashboards...")
-                dashboards = await _generate_dashboards(table_results['processed_tables'])
-                response_data['generated_dashboards'] = dashboards
-        
-        # Step 3: Concept Extraction and Diagram Generation
-        if request.analysis_options.get("concept_extraction", True):
-            logger.info("Performing concept extraction...")
-            concept_results = await _perform_concept_analysis(content_data)
-            response_data['concept_analysis'] = concept_results
-        
-        # Step 4: Modernization Analysis
-        if request.analysis_options.get("modernization_analysis", True):
-            logger.info("Performing modernization analysis...")
-            modernization_results = await _perform_modernization_analysis(content_data)
-            response_data['modernization_analysis'] = modernization_results
+        # Concurrent requests for the same page and options share one run
+        key = (request.confluence_url, frozenset(request.analysis_options.items()), request.output_format)
+        run = _RUNNING_ANALYSES.get(key)
+        if run is None:
+            run = asyncio.ensure_future(_run_enhanced_analysis(request))
+            _RUNNING_ANALYSES[key] = run
+            run.add_done_callback(lambda _: _RUNNING_ANALYSES.pop(key, None))
         
-        # Step 5: Generate Processing Summary and Recommendations
-        logger.info("Generating summary and recommendations...")
-        response_data['processing_summary'] = _generate_processing_summary(response_data)
-        response_data['recommendations'] = _generate_comprehensive_recommendations(response_data)
+        # Shielded so a caller that goes away does not cancel the run for the others
+        response_data = {'analysis_id': analysis_id, **await asyncio.shield(run)}
         
         # Schedule background tasks for additional processing
         background_tasks.add_task(_post_process_analysis, analysis_id, response_data)
         
         logger.info(f"Enhanced analysis {analysis_id} completed successfully")
-        return EnhancedAnalysisResponse(**response_data)
+        return _build_response(response_data)
         
     except Exception as e:
         logger.error(f"Error in enhanced analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+def _build_response(response_data: Dict[str, Any]) -> EnhancedAnalysisResponse:
+    """Assemble the response model without validating it; FastAPI validates it against response_model on the way out."""
+    fields = dict(response_data)
+    for section, model in _SECTION_MODELS.items():
+        if fields[section] is not None:
+            fields[section] = model.model_construct(**fields[section])
+    return EnhancedAnalysisResponse.model_construct(**fields)
+
+async def _run_enhanced_analysis(request: EnhancedAnalysisRequest) -> Dict[str, Any]:
+    """Run the analysis pipeline for a request, returning every response field but the analysis id."""
+    # Step 1: Extract content from Confluence
+    logger.info("Extracting content from Confluence...")
+    content_data = await _extract_confluence_content(request.confluence_url)
+    
+    if not content_data:
+        raise HTTPException(status_code=404, detail="Could not extract content from Confluence URL")
+    
+    # Initialize response components
+    response_data = {
+        'content_metadata': {
+            'title': content_data.get('title', 'Unknown'),
+            'url': request.confluence_url,
+            'content_length': len(content_data.get('raw_text', '')),
+            'analysis_timestamp': datetime.now().isoformat(),
+            'analysis_options': request.analysis_options
+        },
+        'table_analysis': None,
+        'concept_analysis': None,
+        'modernization_analysis': None,
+        'generated_dashboards': [],
+        'processing_summary': {},
+        'recommendations': []
+    }
+    
+    # Steps 2-4: the table, concept and modernization stages only read
+    # content_data, so they run concurrently. Only table analysis needs the
+    # parsed tree, so it is handed over rather than left in content_data
+    options = {**request.analysis_options, **FORMAT_OPTION_MASKS.get(request.output_format, {})}
+    stages = {}
+    if options.get("table_analysis", True):
+        stages['table_analysis'] = _table_then_dashboards(
+            content_data, content_data.pop('soup', None), options.get("dashboard_generation", True)
+        )
+    else:
+        content_data.pop('soup', None)
+    if options.get("concept_extraction", True):
+        logger.info("Performing concept extraction...")
+        stages['concept_analysis'] = _perform_concept_analysis(content_data, options.get("diagram_generation", True))
+    if options.get("modernization_analysis", True):
+        logger.info("Performing modernization analysis...")
+        stages['modernization_analysis'] = _perform_modernization_analysis(content_data)
+    
+    # A failed stage leaves its section empty instead of failing the request
+    results = await asyncio.gather(*stages.values(), return_exceptions=True)
+    for stage, result in zip(stages, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Error in {stage}: {str(result)}")
+            continue
+        
+        if stage == 'table_analysis':
+            result, response_data['generated_dashboards'] = result
+        response_data[stage] = result
+    
+    # Step 5: Generate Processing Summary and Recommendations
+    logger.info("Generating summary and recommendations...")
+    response_data['processing_summary'] = _generate_processing_summary(response_data)
+    response_data['recommendations'] = _generate_comprehensive_recommendations(response_data)
+    
+    return response_data
+
+def _pack_content(content_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Cache entry for extracted content, without the soup and with the large text fields compressed."""
+    entry = {key: value for key, value in content_data.items() if key != 'soup'}
+    for field in _COMPRESSED_FIELDS:
+        if isinstance(entry.get(field), str):
+            entry[field] = zlib.compress(entry[field].encode('utf-8'), 1)
+    return entry
+
+def _unpack_content(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Fresh copy of extracted content from a cache entry."""
+    content_data = dict(entry)
+    for field in _COMPRESSED_FIELDS:
+        if isinstance(content_data.get(field), bytes):
+            content_data[field] = zlib.decompress(content_data[field]).decode('utf-8')
+    return content_data
+
 async def _extract_confluence_content(confluence_url: str) -> Optional[Dict[str, Any]]:
-    """Extract content from Confluence URL."""
+    """Extract content from Confluence URL, reusing a recent extraction of the same page."""
+    cached = _CONTENT_CACHE.get(confluence_url)
+    if cached is not None:
+        return _unpack_content(cached)
+    
+    # Concurrent requests for one page wait for a single fetch
+    lock = _CONTENT_LOCKS.setdefault(confluence_url, asyncio.Lock())
     try:
-        # Extract content using the confluence client
-        content_data = confluence_client.extract_content(confluence_url)
+        async with lock:
+            cached = _CONTENT_CACHE.get(confluence_url)
+            if cached is not None:
+                return _unpack_content(cached)
+            
+            content_data = await _fetch_confluence_content(confluence_url)
+            if content_data:
+                _CONTENT_CACHE.set(confluence_url, _pack_content(content_data))
+            return content_data
+    finally:
+        if not lock.locked():
+            _CONTENT_LOCKS.pop(confluence_url, None)
+
+async def _fetch_confluence_content(confluence_url: str) -> Optional[Dict[str, Any]]:
+    """Fetch and parse a Confluence page for analysis."""
+    try:
+        # Fetch the page over the client's async pool. The processors below are
+        # synchronous, so they run in worker threads to keep the event loop
+        # free for other requests
+        content_data = await confluence_client.aget_page_content_by_url(confluence_url)
         
         if not content_data:
             return None
         
         # Parse the content for enhanced analysis
-        parsed_content = content_analyzer.parse_content(content_data)
+        parsed_content = await asyncio.to_thread(content_analyzer.parse_content, content_data)
         
         return {
             'title': parsed_content.get('title', ''),
@@ -171,31 +365,41 @@ async def _extract_confluence_content(confluence_url: str) -> Optional[Dict[str,
         logger.error(f"Error extracting Confluence content: {str(e)}")
         return None
 
-async def _perform_table_analysis(content_data: Dict[str, Any]) -> Dict[str, Any]:
+def _empty_result(template: Dict[str, Any]) -> Dict[str, Any]:
+    """Fresh copy of an empty stage result, so callers never share its lists."""
+    return {key: type(value)() if isinstance(value, (list, dict)) else value for key, value in template.items()}
+
+def _extract_tables(soup, html: Optional[str]) -> List[Dict[str, Any]]:
+    """Extract and analyze tables, re-parsing the page with lxml when the given tree was not built by it."""
+    # Table extraction searches the whole tree, which lxml builds and walks
+    # far faster than html.parser
+    if html and (soup is None or soup.builder.NAME != 'lxml'):
+        soup = parse_html(html)
+    return table_processor.extract_and_analyze_tables(soup)
+
+async def _perform_table_analysis(content_data: Dict[str, Any], soup=None) -> Dict[str, Any]:
     """Perform comprehensive table analysis."""
     try:
-        soup = content_data.get('soup')
-        if not soup:
-            return {'table_count': 0, 'processed_tables': [], 'dashboard_suggestions': [], 'visualization_potential': 'none'}
+        html = content_data.get('html_content')
+        has_tables = _TABLE_TAG_RE.search(html) is not None if html else soup is not None and soup.find('table') is not None
+        if not has_tables:
+            return _empty_result(EMPTY_TABLE_RESULT)
         
         # Extract and analyze tables
-        processed_tables = table_processor.extract_and_analyze_tables(soup)
+        processed_tables = await asyncio.to_thread(_extract_tables, soup, html)
         
         # Generate dashboard suggestions
-        dashboard_suggestions = []
-        total_visualization_potential = 'low'
+        valid_tables = [table_data for table_data in processed_tables if table_data.get('valid', False)]
+        dashboard_suggestions = list(chain.from_iterable(
+            table_data.get('visualization_suggestions', []) for table_data in valid_tables
+        ))
         
-        for table_data in processed_tables:
-            if table_data.get('valid', False):
-                table_suggestions = table_data.get('visualization_suggestions', [])
-                dashboard_suggestions.extend(table_suggestions)
-                
-                # Update overall visualization potential
-                table_potential = table_data.get('analysis', {}).get('visualization_potential', 'low')
-                if table_potential == 'high':
-                    total_visualization_potential = 'high'
-                elif table_potential == 'medium' and total_visualization_potential != 'high':
-                    total_visualization_potential = 'medium'
+        # Overall visualization potential is the highest of any valid table
+        potential_rank = max((
+            _POTENTIAL_RANK.get(table_data.get('analysis', {}).get('visualization_potential', 'low'), 0)
+            for table_data in valid_tables
+        ), default=0)
+        total_visualization_potential = _POTENTIAL_LEVELS[potential_rank]
         
         return {
             'table_count': len(processed_tables),
@@ -208,19 +412,36 @@ async def _perform_table_analysis(content_data: Dict[str, Any]) -> Dict[str, Any
         logger.error(f"Error in table analysis: {str(e)}")
         return {'table_count': 0, 'processed_tables': [], 'dashboard_suggestions': [], 'visualization_potential': 'error'}
 
-async def _perform_concept_analysis(content_data: Dict[str, Any]) -> Dict[str, Any]:
+async def _table_then_dashboards(content_data: Dict[str, Any], soup, generate_dashboards: bool):
+    """Run table analysis, then build dashboards from its tables if requested."""
+    logger.info("Performing table analysis...")
+    table_results = await _perform_table_analysis(content_data, soup)
+    # The tree is not needed for dashboards; let it be collected now
+    soup = None
+    
+    dashboards = []
+    if generate_dashboards and table_results['processed_tables']:
+        logger.info("Generating interactive dashboards...")
+        dashboards = await _generate_dashboards(table_results['processed_tables'])
+    
+    return table_results, dashboards
+
+async def _perform_concept_analysis(content_data: Dict[str, Any], generate_diagrams: bool = True) -> Dict[str, Any]:
     """Perform concept extraction and diagram generation."""
+    if not content_data.get('raw_text', '').strip():
+        return _empty_result(EMPTY_CONCEPT_RESULT)
+    
     try:
         # Identify concepts and processes
-        concept_results = concept_processor.identify_concepts_and_processes(content_data)
+        concept_results = await asyncio.to_thread(concept_processor.identify_concepts_and_processes, content_data)
         
         # Generate diagrams for identified processes
         generated_diagrams = []
         identified_concepts = concept_results.get('identified_concepts', {})
         
-        if 'processes' in identified_concepts:
+        if generate_diagrams and 'processes' in identified_concepts:
             processes = identified_concepts['processes']
-            diagrams = concept_processor.generate_process_diagrams(processes)
+            diagrams = await asyncio.to_thread(concept_processor.generate_process_diagrams, processes)
             generated_diagrams.extend(diagrams)
         
         return {
@@ -232,18 +453,16 @@ async def _perform_concept_analysis(content_data: Dict[str, Any]) -> Dict[str, A
         
     except Exception as e:
         logger.error(f"Error in concept analysis: {str(e)}")
-        return {
-            'identified_concepts': {},
-            'total_concept_count': 0,
-            'diagram_suggestions': [],
-            'generated_diagrams': []
-        }
+        return _empty_result(EMPTY_CONCEPT_RESULT)
 
 async def _perform_modernization_analysis(content_data: Dict[str, Any]) -> Dict[str, Any]:
     """Perform technology modernization analysis."""
+    if not content_data.get('raw_text', '').strip():
+        return _empty_result(EMPTY_MODERNIZATION_RESULT)
+    
     try:
         # Analyze content for modernization opportunities
-        modernization_results = modernization_engine.analyze_and_modernize_content(content_data)
+        modernization_results = await asyncio.to_thread(modernization_engine.analyze_and_modernize_content, content_data)
         
         return {
             'outdated_technologies': modernization_results.get('outdated_technologies', []),
@@ -254,30 +473,31 @@ async def _perform_modernization_analysis(content_data: Dict[str, Any]) -> Dict[
         
     except Exception as e:
         logger.error(f"Error in modernization analysis: {str(e)}")
-        return {
-            'outdated_technologies': [],
-            'modernization_suggestions': [],
-            'implementation_roadmap': {},
-            'risk_assessment': {}
-        }
+        return _empty_result(EMPTY_MODERNIZATION_RESULT)
 
 async def _generate_dashboards(processed_tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Generate interactive dashboards from processed tables."""
     dashboards = []
     
     try:
-        for i, table_data in enumerate(processed_tables):
-            if not table_data.get('valid', False):
-                continue
-            
-            visualization_suggestions = table_data.get('visualization_suggestions', [])
-            if not visualization_suggestions:
-                continue
-            
-            # Create dashboard
-            dashboard = dashboard_generator.create_interactive_dashboard(
-                table_data, visualization_suggestions
+        candidates = [
+            (i, table_data) for i, table_data in enumerate(processed_tables)
+            if table_data.get('valid', False) and table_data.get('visualization_suggestions')
+        ]
+        
+        # Each table's dashboard is independent, so they are built side by side
+        results = await asyncio.gather(*[
+            asyncio.to_thread(
+                dashboard_generator.create_interactive_dashboard,
+                table_data, table_data['visualization_suggestions']
             )
+            for _, table_data in candidates
+        ], return_exceptions=True)
+        
+        for (i, table_data), dashboard in zip(candidates, results):
+            if isinstance(dashboard, BaseException):
+                logger.error(f"Error generating dashboard for table {i}: {str(dashboard)}")
+                continue
             
             if dashboard and 'error' not in dashboard:
                 dashboard['table_index'] = i
@@ -292,82 +512,58 @@ async def _generate_dashboards(processed_tables: List[Dict[str, Any]]) -> List[D
 
 def _generate_processing_summary(response_data: Dict[str, Any]) -> Dict[str, Any]:
     """Generate processing summary statistics."""
-    summary = {
+    table_analysis = response_data['table_analysis']
+    concept_analysis = response_data['concept_analysis']
+    modernization_analysis = response_data['modernization_analysis']
+    
+    return {
         'total_processing_time': 'calculated_in_background',
         'content_analysis': {
             'content_length': response_data['content_metadata']['content_length'],
             'analysis_completeness': 'full'
         },
         'table_processing': {
-            'tables_found': 0,
-            'tables_processed': 0,
+            'tables_found': table_analysis['table_count'] if table_analysis else 0,
+            'tables_processed': len(table_analysis['processed_tables']) if table_analysis else 0,
             'dashboards_generated': len(response_data['generated_dashboards'])
         },
         'concept_extraction': {
-            'concepts_identified': 0,
-            'diagrams_generated': 0
+            'concepts_identified': concept_analysis['total_concept_count'] if concept_analysis else 0,
+            'diagrams_generated': len(concept_analysis['generated_diagrams']) if concept_analysis else 0
         },
         'modernization_analysis': {
-            'outdated_technologies_found': 0,
-            'suggestions_generated': 0
+            'outdated_technologies_found': len(modernization_analysis['outdated_technologies']) if modernization_analysis else 0,
+            'suggestions_generated': len(modernization_analysis['modernization_suggestions']) if modernization_analysis else 0
         }
     }
-    
-    # Update table processing stats
-    if response_data['table_analysis']:
-        summary['table_processing']['tables_found'] = response_data['table_analysis']['table_count']
-        summary['table_processing']['tables_processed'] = len(response_data['table_analysis']['processed_tables'])
-    
-    # Update concept extraction stats
-    if response_data['concept_analysis']:
-        summary['concept_extraction']['concepts_identified'] = response_data['concept_analysis']['total_concept_count']
-        summary['concept_extraction']['diagrams_generated'] = len(response_data['concept_analysis']['generated_diagrams'])
-    
-    # Update modernization stats
-    if response_data['modernization_analysis']:
-        summary['modernization_analysis']['outdated_technologies_found'] = len(response_data['modernization_analysis']['outdated_technologies'])
-        summary['modernization_analysis']['suggestions_generated'] = len(response_data['modernization_analysis']['modernization_suggestions'])
-    
-    return summary
+
+def _fill_recommendation(template: Dict[str, str], value: Any) -> Dict[str, str]:
+    """Copy a recommendation template with its description filled in."""
+    return {**template, 'description': template['description'].format(value)}
 
 def _generate_comprehensive_recommendations(response_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Generate comprehensive recommendations based on analysis results."""
     recommendations = []
+    # Counts come from the processing summary, which is built first
+    summary = response_data['processing_summary']
+    dashboard_count = summary['table_processing']['dashboards_generated']
+    diagram_count = summary['concept_extraction']['diagrams_generated']
+    tech_count = summary['modernization_analysis']['outdated_technologies_found']
     
     # Dashboard recommendations
-    if response_data['generated_dashboards']:
-        recommendations.append({
-            'type': 'visualization',
-            'priority': 'high',
-            'title': 'Interactive Dashboards Available',
-            'description': f"Generated {len(response_data['generated_dashboards'])} interactive dashboards from your table data.",
-            'action': 'Review and embed dashboards into your Confluence page for better data presentation.',
-            'benefit': 'Improved data visualization and user engagement'
-        })
+    if dashboard_count:
+        recommendations.append(_fill_recommendation(_DASHBOARD_RECOMMENDATION, dashboard_count))
     
     # Concept diagram recommendations
-    if response_data['concept_analysis'] and response_data['concept_analysis']['generated_diagrams']:
-        diagram_count = len(response_data['concept_analysis']['generated_diagrams'])
-        recommendations.append({
-            'type': 'documentation',
-            'priority': 'medium',
-            'title': 'Process Diagrams Generated',
-            'description': f"Identified {diagram_count} processes that can be visualized as flowcharts.",
-            'action': 'Add generated flowcharts to improve process documentation clarity.',
-            'benefit': 'Enhanced process understanding and documentation quality'
-        })
+    if diagram_count:
+        recommendations.append(_fill_recommendation(_DIAGRAM_RECOMMENDATION, diagram_count))
     
     # Modernization recommendations
-    if response_data['modernization_analysis'] and response_data['modernization_analysis']['outdated_technologies']:
-        tech_count = len(response_data['modernization_analysis']['outdated_technologies'])
-        recommendations.append({
-            'type': 'modernization',
-            'priority': 'high' if tech_count > 3 else 'medium',
-            'title': 'Technology Modernization Opportunities',
-            'description': f"Found {tech_count} outdated technologies that should be modernized.",
-            'action': 'Review modernization roadmap and plan technology updates.',
-            'benefit': 'Improved security, performance, and maintainability'
-        })
+    if tech_count:
+        recommendation = _fill_recommendation(_MODERNIZATION_RECOMMENDATION, tech_count)
+        if tech_count > 3:
+            recommendation['priority'] = 'high'
+        recommendations.append(recommendation)
     
     # Content enhancement recommendations
     table_potential = 'none'
@@ -375,14 +571,7 @@ def _generate_comprehensive_recommendations(response_data: Dict[str, Any]) -> Li
         table_potential = response_data['table_analysis']['visualization_potential']
     
     if table_potential in ['medium', 'high']:
-        recommendations.append({
-            'type': 'content_enhancement',
-            'priority': 'medium',
-            'title': 'Content Enhancement Opportunities',
-            'description': f"Your content has {table_potential} potential for interactive enhancements.",
-            'action': 'Consider adding more interactive elements and visualizations.',
-            'benefit': 'Better user experience and information accessibility'
-        })
+        recommendations.append(_fill_recommendation(_ENHANCEMENT_RECOMMENDATION, table_potential))
     
     return recommendations
 
@@ -406,31 +595,9 @@ async def _post_process_analysis(analysis_id: str, response_data: Dict[str, Any]
 async def get_analysis_status(analysis_id: str):
     """Get the status of an analysis job."""
     # This would typically check a database or cache for job status
-    return {
-        'analysis_id': analysis_id,
-        'status': 'completed',  # completed, processing, failed
-        'progress': 100,
-        'message': 'Analysis completed successfully'
-    }
+    return {'analysis_id': analysis_id, **_COMPLETED_STATUS}
 
 @router.get("/capabilities")
 async def get_analysis_capabilities():
     """Get information about available analysis capabilities."""
-    return {
-        'table_analysis': {
-            'description': 'Extract and analyze table data for visualization opportunities',
-            'features': ['Data type detection', 'Pattern identification', 'Visualization suggestions', 'Dashboard generation']
-        },
-        'concept_extraction': {
-            'description': 'Identify concepts and processes suitable for diagramming',
-            'features': ['Process identification', 'Workflow extraction', 'Flowchart generation', 'Architecture diagrams']
-        },
-        'modernization_analysis': {
-            'description': 'Analyze content for technology modernization opportunities',
-            'features': ['Outdated technology detection', 'Modern alternatives', 'Implementation roadmaps', 'Risk assessment']
-        },
-        'dashboard_generation': {
-            'description': 'Create interactive dashboards from data',
-            'features': ['Multiple chart types', 'Interactive filters', 'Real-time updates', 'Export capabilities']
-        }
-    }
+    return Response(content=_CAPABILITIES_BODY, media_type="application/json")
@@ -15,6 +15,12 @@ from src.utils.config import Settings
 
 logger = logging.getLogger(__name__)
 
+# Connection pool for a creator's Confluence calls; one session per creator
+# keeps connections alive instead of a new TCP and TLS handshake per call
+PAGE_CREATOR_CONNECTION_LIMIT = 100
+PAGE_CREATOR_CONNECTIONS_PER_HOST = 10
+PAGE_CREATOR_DNS_CACHE_TTL = 300
+
 
 class ConfluencePageCreator:
     """Service for creating new enhanced Confluence pages."""
@@ -27,6 +33,28 @@ class ConfluencePageCreator:
             settings.CONFLUENCE_API_TOKEN
         )
         self.creation_timeout = 300  # 5 minutes timeout for page creation
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session, created on first use so its keep-alive connections are reused."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=PAGE_CREATOR_CONNECTION_LIMIT,
+                limit_per_host=PAGE_CREATOR_CONNECTIONS_PER_HOST,
+                ttl_dns_cache=PAGE_CREATOR_DNS_CACHE_TTL,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.creation_timeout)
+            )
+        return self._session
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
         
     async def create_enhanced_page(
         self, 
@@ -405,31 +433,31 @@ class ConfluencePageCreator:
                 page_data["ancestors"] = [{"id": page_details['parent_id']}]
             
             # Create the page
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/wiki/rest/api/content",
-                    auth=self.auth,
-                    json=page_data,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
+            session = await self._get_session()
+            async with session.post(
+                f"{self.base_url}/wiki/rest/api/content",
+                auth=self.auth,
+                json=page_data,
+                headers={'Content-Type': 'application/json'}
+            ) as response:
+                
+                if response.status == 200:
+                    result = await response.json()
+                    page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
+                    
+                    return {
+                        'success': True,
+                        'page_id': result['id'],
+                        'page_url': page_url
+                    }
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Failed to create page: {response.status} - {error_text}")
+                    return {
+                        'success': False,
+                        'error': f"HTTP {response.status}: {error_text}"
+                    }
                     
-                    if response.status == 200:
-                        result = await response.json()
-                        page_url = f"{self.base_url}/wiki{result['_links']['webui']}"
-                        
-                        return {
-                            'success': True,
-                            'page_id': result['id'],
-                            'page_url': page_url
-                        }
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Failed to create page: {response.status} - {error_text}")
-                        return {
-                            'success': False,
-                            'error': f"HTTP {response.status}: {error_text}"
-                        }
-                        
         except Exception as e:
             logger.error(f"Error creating Confluence page: {e}")
             return {
@@ -510,6 +538,23 @@ class ConfluencePageCreator:
         }
 
 
+# Markdown constructs and their Confluence wiki markup replacements, applied
+# in this order by ConfluenceMarkupConverter
+_MD_HEADER_RE = re.compile(r'^(#{1,4}) (.*?)$', re.MULTILINE)
+_MD_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_MD_ITALIC_RE = re.compile(r'\*(.*?)\*')
+_MD_CODE_BLOCK_RE = re.compile(r'```(\w+)?\n(.*?)\n```', re.DOTALL)
+_MD_INLINE_CODE_RE = re.compile(r'`(.*?)`')
+_MD_BULLET_RE = re.compile(r'^- (.*?)$', re.MULTILINE)
+_MD_NUMBERED_RE = re.compile(r'^\d+\. (.*?)$', re.MULTILINE)
+_MD_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+
+
+def _confluence_header(match) -> str:
+    """Confluence heading for a markdown '#' to '####' heading"""
+    return f"h{len(match.group(1))}. {match.group(2)}"
+
+
 class ConfluenceMarkupConverter:
     """Converts various markup formats to Confluence markup"""
     
@@ -517,27 +562,24 @@ class ConfluenceMarkupConverter:
         """Convert markdown-style content to Confluence markup"""
         
         # Convert headers
-        content = re.sub(r'^# (.*?)$', r'h1. \1', content, flags=re.MULTILINE)
-        content = re.sub(r'^## (.*?)$', r'h2. \1', content, flags=re.MULTILINE)
-        content = re.sub(r'^### (.*?)$', r'h3. \1', content, flags=re.MULTILINE)
-        content = re.sub(r'^#### (.*?)$', r'h4. \1', content, flags=re.MULTILINE)
+        content = _MD_HEADER_RE.sub(_confluence_header, content)
         
         # Convert bold and italic
-        content = re.sub(r'\*\*(.*?)\*\*', r'*\1*', content)
-        content = re.sub(r'\*(.*?)\*', r'_\1_', content)
+        content = _MD_BOLD_RE.sub(r'*\1*', content)
+        content = _MD_ITALIC_RE.sub(r'_\1_', content)
         
         # Convert code blocks
-        content = re.sub(r'```(\w+)?\n(.*?)\n```', self._convert_code_block, content, flags=re.DOTALL)
+        content = _MD_CODE_BLOCK_RE.sub(self._convert_code_block, content)
         
         # Convert inline code
-        content = re.sub(r'`(.*?)`', r'{{\1}}', content)
+        content = _MD_INLINE_CODE_RE.sub(r'{{\1}}', content)
         
         # Convert lists
-        content = re.sub(r'^- (.*?)$', r'* \1', content, flags=re.MULTILINE)
-        content = re.sub(r'^\d+\. (.*?)$', r'# \1', content, flags=re.MULTILINE)
+        content = _MD_BULLET_RE.sub(r'* \1', content)
+        content = _MD_NUMBERED_RE.sub(r'# \1', content)
         
         # Convert links
-        content = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'[\1|\2]', content)
+        content = _MD_LINK_RE.sub(r'[\1|\2]', content)
         
         return content
     
@@ -597,31 +639,31 @@ class ConfluenceMarkupConverter:
                 page_payload['ancestors'] = [{'id': config['parent_page_id']}]
             
             # Create page via API
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/rest/api/content",
-                    auth=self.auth,
-                    json=page_payload,
-                    headers={'Content-Type': 'application/json'}
-                ) as response:
-                    
-                    if response.status == 200:
-                        result = await response.json()
-                        page_url = f"{self.base_url}/pages/viewpage.action?pageId={result['id']}"
-                        
-                        return {
-                            'success': True,
-                            'page_id': result['id'],
-                            'page_url': page_url,
-                            'page_data': result
-                        }
-                    else:
-                        error_text = await response.text()
-                        return {
-                            'success': False,
-                            'error': f"HTTP {response.status}: {error_text}"
-                        }
+            session = await self._get_session()
+            async with session.post(
+                f"{self.base_url}/rest/api/content",
+                auth=self.auth,
+                json=page_payload,
+                headers={'Content-Type': 'application/json'}
+            ) as response:
                 
+                if response.status == 200:
+                    result = await response.json()
+                    page_url = f"{self.base_url}/pages/viewpage.action?pageId={result['id']}"
+                    
+                    return {
+                        'success': True,
+                        'page_id': result['id'],
+                        'page_url': page_url,
+                        'page_data': result
+                    }
+                else:
+                    error_text = await response.text()
+                    return {
+                        'success': False,
+                        'error': f"HTTP {response.status}: {error_text}"
+                    }
+            
         except Exception as e:
             logger.error(f"Error executing page creation: {str(e)}")
             return {
@@ -736,11 +778,14 @@ async def create_enhanced_page(
         }
     }
     
-    return await page_creator.create_enhanced_page(
-        enhanced_content,
-        original_page_info,
-        report_data
-    )
+    try:
+        return await page_creator.create_enhanced_page(
+            enhanced_content,
+            original_page_info,
+            report_data
+        )
+    finally:
+        await page_creator.aclose()
 
 
 # Page creation utility functions
@@ -770,11 +815,14 @@ async def create_enhanced_page(
     
     # Create enhanced page
     page_creator = ConfluencePageCreator(settings)
-    result = await page_creator.create_enhanced_page(
-        page_info,
-        enhanced_content,
-        visualizations
-    )
+    try:
+        result = await page_creator.create_enhanced_page(
+            page_info,
+            enhanced_content,
+            visualizations
+        )
+    finally:
+        await page_creator.aclose()
     
     return result
 
@@ -1,9 +1,9 @@
 """
 Data models for content storage and processing
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 
 
@@ -27,8 +27,18 @@ class ContentModel(BaseModel):
     updated_date: Optional[datetime] = None
     version_number: int = 1
     
+    # (raw_text, raw_text.lower()) from the last lower_text() call
+    _lower_text: Optional[Tuple[str, str]] = PrivateAttr(default=None)
+    
     class Config:
         from_attributes = True
+    
+    def lower_text(self) -> str:
+        """Lowercased raw_text, computed once per raw_text value"""
+        cached = self._lower_text
+        if cached is None or cached[0] is not self.raw_text:
+            cached = self._lower_text = (self.raw_text, self.raw_text.lower())
+        return cached[1]
 
 
 class TableData(BaseModel):
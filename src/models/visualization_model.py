@@ -3,7 +3,8 @@ Data models for visualizations
 """
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel, Field
+import json
+from pydantic import BaseModel, Field, field_serializer
 from enum import Enum
 
 
@@ -51,6 +52,13 @@ class VisualizationModel(BaseModel):
     
     class Config:
         from_attributes = True
+    
+    @field_serializer('data')
+    def serialize_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert the figure's numpy trace columns to lists when the model is dumped"""
+        from plotly.utils import PlotlyJSONEncoder
+        
+        return json.loads(json.dumps(data, cls=PlotlyJSONEncoder))
 
 
 class DashboardModel(BaseModel):
@@ -256,7 +256,7 @@ class TechAnalyzer:
             logger.info(f"Analyzing technology stack in: {content.title}")
             
             detections = []
-            content_text = content.raw_text.lower()
+            content_text = content.lower_text()
             lines = content.raw_text.split('\n')
             
             for tech_name, patterns in self.technology_patterns.items():
@@ -128,7 +128,7 @@ class ConceptProcessor:
         
         try:
             # Look for workflow patterns in text
-            text = content.raw_text.lower()
+            text = content.lower_text()
             
             # Simple pattern matching for workflows
             workflow_indicators = ['workflow', 'process flow', 'pipeline', 'sequence']
@@ -153,7 +153,7 @@ class ConceptProcessor:
         architectures = []
         
         try:
-            text = content.raw_text.lower()
+            text = content.lower_text()
             
             # Architecture indicators
             arch_indicators = [
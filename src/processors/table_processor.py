@@ -97,13 +97,15 @@ class DataAnalyzer:
         # Check for numeric patterns
         if self._is_numeric_column(non_null_data):
             numeric_values = [self._extract_numeric(item) for item in non_null_data]
+            low = min(numeric_values)
+            high = max(numeric_values)
             return {
                 'type': 'numeric',
                 'completeness': completeness,
-                'min': min(numeric_values),
-                'max': max(numeric_values),
+                'min': low,
+                'max': high,
                 'mean': sum(numeric_values) / len(numeric_values),
-                'range': max(numeric_values) - min(numeric_values)
+                'range': high - low
             }
         
         # Check for categorical patterns
@@ -31,6 +31,8 @@ class Settings(BaseSettings):
     # AI/ML Settings
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4"
+    OPENAI_ANALYSIS_MODEL: str = "gpt-4o-mini"  # Issue detection / classification
+    OPENAI_REWRITE_MODEL: str = "gpt-4o"  # Enhanced content generation
     OPENAI_MAX_TOKENS: int = 4000
     OPENAI_TEMPERATURE: float = 0.3
     
@@ -62,6 +64,8 @@ class Settings(BaseSettings):
     MAX_PROCESSING_TIME: int = 300  # 5 minutes
     CHUNK_SIZE: int = 4000  # For AI processing
     MAX_CONCURRENT_REQUESTS: int = 10
+    VALIDATE_EXTERNAL_LINKS: bool = False  # HEAD-check external links
+    LINK_CHECK_TIMEOUT: int = 5
     
     # Visualization Settings
     MAX_CHART_DATA_POINTS: int = 10000
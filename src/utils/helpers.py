@@ -4,6 +4,8 @@ Utility helper functions
 import logging
 import hashlib
 import json
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 import re
@@ -27,6 +29,45 @@ def generate_hash(content: str) -> str:
     return hashlib.sha256(content.encode()).hexdigest()
 
 
+class LRUCache:
+    """Small in-process LRU cache with optional expiry"""
+    
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value, or default if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[key]
+            return default
+        
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 def clean_text(text: str) -> str:
     """Clean and normalize text content"""
     # Remove extra whitespace
@@ -92,11 +133,170 @@ def format_timestamp(dt: Optional[datetime] = None) -> str:
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def extract_table_data(html_table: str) -> Dict[str, Any]:
-    """Extract structured data from HTML table"""
+# Tree builder for every page parse; lxml parses in C, html.parser is the
+# pure-Python fallback for installs without it
+try:
+    import lxml  # noqa: F401
+    _BS_PARSER = 'lxml'
+except ImportError:
+    _BS_PARSER = 'html.parser'
+
+# lxml wraps fragments in <html><body>; only keep that wrapper if the page had one
+_BODY_TAG_RE = re.compile(r'<body[\s>]', re.IGNORECASE)
+
+
+def parse_html(html: str):
+    """Parse HTML into a BeautifulSoup tree, using the C-backed lxml parser when available"""
     from bs4 import BeautifulSoup
     
-    soup = BeautifulSoup(html_table, 'html.parser')
+    # lxml's HTML parser drops CDATA sections, which Confluence storage format
+    # uses for code macro bodies; keep those pages on html.parser
+    if '<![CDATA[' in html:
+        return BeautifulSoup(html, 'html.parser')
+    
+    return BeautifulSoup(html, _BS_PARSER)
+
+
+def parse_html_fragment(html: str) -> list:
+    """Parse an HTML snippet into nodes that can be inserted into another tree"""
+    from bs4 import NavigableString
+    
+    soup = parse_html(html)
+    root = soup.body if soup.body is not None else soup
+    nodes = list(root.contents)
+    
+    # lxml drops whitespace at the very start of a document, which matters
+    # when the snippet is the middle of a sentence
+    leading = html[:len(html) - len(html.lstrip())]
+    if leading:
+        nodes.insert(0, NavigableString(leading))
+    
+    return nodes
+
+
+def serialize_html(soup, original_html: str) -> str:
+    """Serialize a parsed page back to the same shape it was given in"""
+    if soup.body is not None and not _BODY_TAG_RE.search(original_html):
+        return soup.body.decode_contents()
+    return str(soup)
+
+
+# Tags whose strings BeautifulSoup's get_text() leaves out
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+def _lxml_text_nodes(root):
+    """Yield the text nodes under an lxml element in document order, as get_text() sees them"""
+    from lxml import etree
+    
+    skipped = 0
+    for event, node in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        if event in ('comment', 'pi'):
+            # Their own text is not page text, but what follows them is
+            if not skipped and node.tail:
+                yield node.tail
+            continue
+        
+        if event == 'start':
+            if node.tag in _NON_TEXT_TAGS:
+                skipped += 1
+            if not skipped and node.text:
+                yield node.text
+        else:
+            if node.tag in _NON_TEXT_TAGS:
+                skipped -= 1
+            if node is not root and not skipped and node.tail:
+                yield node.tail
+
+
+def _lxml_heading_text(tag) -> str:
+    """Text of an lxml heading element, as get_text(' ', strip=True) gives it"""
+    if any(ancestor.tag in _NON_TEXT_TAGS for ancestor in tag.iterancestors()):
+        return ''
+    return ' '.join(part for part in (string.strip() for string in _lxml_text_nodes(tag)) if part)
+
+
+def _stream_text_and_headings(html: str):
+    """Stream a page through lxml, dropping each element once it has been read"""
+    from io import BytesIO
+    from lxml import etree
+    
+    parts = []
+    headings = []
+    open_headings = []
+    skipped = 0
+    # iterparse only guarantees an element's text and tail once the next
+    # event arrives, so each event settles the (node, attribute) before it
+    pending = None
+    
+    def settle(node, attr, was_skipped):
+        value = getattr(node, attr)
+        if value and not was_skipped:
+            parts.append(value.strip())
+        if attr == 'tail' and not open_headings:
+            # Nothing more is needed from this node or its finished siblings;
+            # headings keep their subtree until their own text is taken
+            node.clear()
+            parent = node.getparent()
+            while parent is not None and node.getprevious() is not None:
+                del parent[0]
+    
+    events = etree.iterparse(BytesIO(html.encode('utf-8')), events=('start', 'end', 'comment', 'pi'),
+                             html=True, encoding='utf-8')
+    for event, node in events:
+        if pending is not None:
+            settle(*pending)
+            pending = None
+        
+        if event in ('comment', 'pi'):
+            # Their own text is not page text, but what follows them is
+            pending = (node, 'tail', skipped)
+        elif event == 'start':
+            if node.tag in _NON_TEXT_TAGS:
+                skipped += 1
+            if node.tag in _HEADING_TAGS:
+                # Slot reserved now so nested headings keep document order
+                open_headings.append((len(headings), node))
+                headings.append(None)
+            pending = (node, 'text', skipped)
+        else:
+            if node.tag in _NON_TEXT_TAGS:
+                skipped -= 1
+            if open_headings and open_headings[-1][1] is node:
+                index, _ = open_headings.pop()
+                headings[index] = {'level': int(node.tag[1]), 'text': _lxml_heading_text(node), 'index': index}
+            if node.getparent() is not None:
+                pending = (node, 'tail', skipped)
+    
+    if pending is not None:
+        settle(*pending)
+    
+    return ''.join(parts), headings
+
+
+def extract_text_and_headings(html: str):
+    """Return a page's stripped text and its h1-h6 outline without building a BeautifulSoup tree"""
+    if _BS_PARSER == 'lxml' and '<![CDATA[' not in html:
+        from lxml import etree
+        
+        try:
+            return _stream_text_and_headings(html)
+        except etree.LxmlError:
+            # Empty documents; BeautifulSoup copes with those
+            pass
+    
+    soup = parse_html(html)
+    headings = [
+        {'level': int(tag.name[1]), 'text': tag.get_text(' ', strip=True), 'index': index}
+        for index, tag in enumerate(soup.find_all(list(_HEADING_TAGS)))
+    ]
+    return soup.get_text(strip=True), headings
+
+
+def extract_table_data(html_table: str) -> Dict[str, Any]:
+    """Extract structured data from HTML table"""
+    soup = parse_html(html_table)
     table = soup.find('table')
     
     if not table:
@@ -128,46 +328,46 @@ def extract_table_data(html_table: str) -> Dict[str, Any]:
     return {'headers': headers, 'rows': rows}
 
 
+# A cell counts as numeric when float() would accept it once thousands
+# separators, currency and percent signs are removed; matching the grammar
+# avoids raising and catching a ValueError for every text cell
+_NUMERIC_CELL_RE = re.compile(
+    r'\s*[+-]?(?:(?:\d(?:_?\d)*(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)(?:[eE][+-]?\d(?:_?\d)*)?'
+    r'|inf(?:inity)?|nan)\s*',
+    re.IGNORECASE
+)
+_DATE_CELL_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}')
+
+
 def detect_data_types(data: List[List[str]]) -> List[str]:
     """Detect data types for table columns"""
     if not data:
         return []
     
-    num_cols = len(data[0]) if data else 0
+    num_cols = len(data[0])
     types = ['text'] * num_cols
+    is_numeric = _NUMERIC_CELL_RE.fullmatch
+    is_date = _DATE_CELL_RE.match
     
     for col_idx in range(num_cols):
-        column_values = [row[col_idx] for row in data if col_idx < len(row)]
-        
-        # Check if numeric
-        numeric_count = 0
-        date_count = 0
+        column_values = [row[col_idx] for row in data if col_idx < len(row) and row[col_idx]]
         
-        for value in column_values:
-            if not value:
-                continue
-                
-            # Check for numeric
-            try:
-                float(value.replace(',', '').replace('$', '').replace('%', ''))
-                numeric_count += 1
-            except ValueError:
-                pass
-            
-            # Check for date
-            if re.match(r'\d{4}-\d{2}-\d{2}', value) or re.match(r'\d{1,2}/\d{1,2}/\d{4}', value):
-                date_count += 1
-        
-        total_values = len([v for v in column_values if v])
+        total_values = len(column_values)
         if total_values == 0:
             continue
-            
+        
+        numeric_count = sum(
+            1 for value in column_values
+            if is_numeric(value.replace(',', '').replace('$', '').replace('%', ''))
+        )
         if numeric_count / total_values > 0.8:
             types[col_idx] = 'numeric'
-        elif date_count / total_values > 0.8:
+            continue
+        
+        date_count = sum(1 for value in column_values if is_date(value))
+        if date_count / total_values > 0.8:
             types[col_idx] = 'date'
     
     return types
 
-
 logger = setup_logging()
@@ -0,0 +1,138 @@
+"""
+Tests for generating enhanced content and applying it to the element it targets
+"""
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.ai_engine.enhancement_engine import Enhancement, EnhancementEngine
+from src.models.content_model import ContentModel
+from src.models.enhancement_model import EnhancementType
+
+
+PAGE_HTML = (
+    "<h1>Guide</h1>"
+    "<p>Intro text.</p>"
+    "<h2>Setup</h2>"
+    "<p>Install it.</p>"
+    "<h3>Details</h3>"
+    "<p>More detail.</p>"
+    "<h2>Usage</h2>"
+    "<p>Run it.</p>"
+    "<table><tr><td>a</td><td>b</td></tr></table>"
+)
+
+
+def make_enhancement(location: str, enhanced_content: str, engine: EnhancementEngine) -> Enhancement:
+    """Build an enhancement targeting an issue location such as 'paragraph 2'"""
+    target_selector, target_index, target_section = engine._resolve_issue_target({'location': location})
+    return Enhancement(
+        id="enh_test",
+        type=EnhancementType.CONTENT_RESTRUCTURE,
+        title="Test enhancement",
+        description="",
+        priority="medium",
+        category="clarity",
+        original_content="",
+        enhanced_content=enhanced_content,
+        confidence=0.9,
+        metrics=None,
+        issues=[],
+        recommendations=[],
+        target_selector=target_selector,
+        target_index=target_index,
+        target_section=target_section
+    )
+
+
+class TestApplyToTarget:
+    """Enhancements replace exactly the part of the page their issue points at"""
+
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        return EnhancementEngine()
+
+    def test_paragraph_inline_content_replaces_text(self, engine):
+        enhancement = make_enhancement("paragraph 2", "Install it with <code>pip</code>.", engine)
+        result = engine._apply_to_target(PAGE_HTML, enhancement)
+        assert "<p>Install it with <code>pip</code>.</p>" in result
+        assert "Install it.</p>" not in result
+
+    def test_paragraph_block_content_is_not_nested(self, engine):
+        enhancement = make_enhancement("paragraph 2", "<p>Step one.</p><p>Step two.</p>", engine)
+        result = engine._apply_to_target(PAGE_HTML, enhancement)
+        assert "<h2>Setup</h2><p>Step one.</p><p>Step two.</p><h3>" in result
+        assert "<p><p>" not in result
+
+    def test_section_replaces_heading_and_subsections(self, engine):
+        enhancement = make_enhancement("section 2", "<h2>Installation</h2><p>Install with pip.</p>", engine)
+        result = engine._apply_to_target(PAGE_HTML, enhancement)
+        assert "<p>Intro text.</p><h2>Installation</h2><p>Install with pip.</p><h2>Usage</h2>" in result
+        assert "Setup" not in result
+        assert "More detail." not in result
+
+    def test_section_body_keeps_heading(self, engine):
+        enhancement = make_enhancement("section 4", "<p>Run it with the CLI.</p>", engine)
+        result = engine._apply_to_target(PAGE_HTML, enhancement)
+        assert result.endswith("<h2>Usage</h2><p>Run it with the CLI.</p>")
+
+    def test_table_is_replaced_as_a_whole(self, engine):
+        new_table = "<table><tr><th>Key</th><th>Value</th></tr><tr><td>a</td><td>b</td></tr></table>"
+        enhancement = make_enhancement("table 1", new_table, engine)
+        result = engine._apply_to_target(PAGE_HTML, enhancement)
+        assert result.endswith(new_table)
+        assert result.count("<table>") == 1
+
+    def test_plain_text_for_table_leaves_page_unchanged(self, engine):
+        enhancement = make_enhancement("table 1", "A clearer table.", engine)
+        assert engine._apply_to_target(PAGE_HTML, enhancement) == PAGE_HTML
+
+    def test_target_not_found_leaves_page_unchanged(self, engine):
+        enhancement = make_enhancement("paragraph 9", "<p>New text.</p>", engine)
+        assert engine._apply_to_target(PAGE_HTML, enhancement) == PAGE_HTML
+
+    def test_unknown_location_leaves_page_unchanged(self, engine):
+        enhancement = make_enhancement("somewhere near the top", "<p>New text.</p>", engine)
+        assert enhancement.target_selector is None
+        assert engine._apply_to_target(PAGE_HTML, enhancement) == PAGE_HTML
+
+
+class TestBatchedEnhancedContent:
+    """The batched rewrite call reads its results out of a JSON object"""
+
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+        return EnhancementEngine()
+
+    @pytest.fixture
+    def content(self):
+        return ContentModel(page_url="https://test.com/page", title="Guide", raw_html=PAGE_HTML, raw_text="Guide")
+
+    def mock_reply(self, engine, reply: str) -> AsyncMock:
+        create = AsyncMock(return_value=Mock(choices=[Mock(message=Mock(content=reply))]))
+        engine.openai_client = Mock(chat=Mock(completions=Mock(create=create)))
+        return create
+
+    @pytest.mark.asyncio
+    async def test_improvements_are_read_from_json_object(self, engine, content):
+        issues = [
+            {'description': 'Vague intro', 'location': 'paragraph 1', 'suggestion': 'Be specific'},
+            {'description': 'Terse setup', 'location': 'paragraph 2', 'suggestion': 'Add steps'},
+        ]
+        create = self.mock_reply(engine, json.dumps({'improvements': [
+            {'index': 1, 'improved_content': '<p>Install with pip.</p>'},
+            {'index': 0, 'improved_content': '<p>This guide covers setup.</p>'},
+        ]}))
+
+        results = await engine._generate_enhanced_content_batch(content, issues)
+
+        assert results == ['<p>This guide covers setup.</p>', '<p>Install with pip.</p>']
+        assert create.call_args.kwargs['response_format'] == {"type": "json_object"}
+
+    @pytest.mark.asyncio
+    async def test_reply_without_improvements_list_yields_no_content(self, engine, content):
+        issues = [{'description': 'Vague intro', 'location': 'paragraph 1', 'suggestion': 'Be specific'}]
+        self.mock_reply(engine, json.dumps([{'index': 0, 'improved_content': '<p>Text.</p>'}]))
+
+        assert await engine._generate_enhanced_content_batch(content, issues) == ['']
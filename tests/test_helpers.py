@@ -0,0 +1,45 @@
+"""
+Tests for the HTML helpers shared across the extractors
+"""
+import pytest
+from src.utils.helpers import _HEADING_TAGS, extract_text_and_headings, parse_html
+
+
+PAGES = {
+    'plain': "<h1>Title</h1><p>Some <b>bold</b> text.</p><h2>Next</h2><p>More.</p>",
+    'entities': "<h1>Q&amp;A &lt;intro&gt;</h1><p>Caf&eacute; &#8211; &nbsp;menu &copy; 2024</p>",
+    'cdata': "<h2>Code</h2><ac:plain-text-body><![CDATA[print('<b>hi</b>')]]></ac:plain-text-body><p>After</p>",
+    'script_style': (
+        "<style>p { color: red; }</style><h1>Head<script>var x = '<h2>no</h2>';</script>ing</h1>"
+        "<p>Body<script>alert(1)</script> text</p><template><h3>Hidden</h3></template>"
+    ),
+    'unclosed': "<h1>Open heading<p>First para<p>Second <b>bold<h2>Inner</h2><li>item",
+    'nested_headings': "<h1>Outer <h2>inner</h2> tail</h1><h3>  spaced   words </h3>",
+    'comments': "<p>Before<!-- note -->after</p><h4><!-- x -->Commented</h4><?pi data?><p>End</p>",
+    'empty': "",
+    'whitespace': "   \n ",
+}
+
+
+def reference_text_and_headings(html: str):
+    """What extract_text_and_headings returned when it built a BeautifulSoup tree"""
+    soup = parse_html(html)
+    headings = [
+        {'level': int(tag.name[1]), 'text': tag.get_text(' ', strip=True), 'index': index}
+        for index, tag in enumerate(soup.find_all(list(_HEADING_TAGS)))
+    ]
+    return soup.get_text(strip=True), headings
+
+
+class TestExtractTextAndHeadings:
+    """The streaming lxml path matches BeautifulSoup's text and heading outline"""
+
+    @pytest.mark.parametrize('name', sorted(PAGES))
+    def test_matches_beautifulsoup(self, name):
+        html = PAGES[name]
+        assert extract_text_and_headings(html) == reference_text_and_headings(html)
+
+    def test_headings_keep_document_order(self):
+        _, headings = extract_text_and_headings(PAGES['nested_headings'])
+        assert [heading['level'] for heading in headings] == [1, 2, 3]
+        assert [heading['index'] for heading in headings] == [0, 1, 2]
@@ -0,0 +1,56 @@
+"""
+Tests for validating the links found on a page
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from src.api import content_extractor as extractor_module
+from src.api.content_extractor import ContentExtractor
+from src.models.content_model import ContentModel
+
+
+LINKS = [
+    {'url': 'https://ok.example.com/', 'external': True},
+    {'url': 'https://gone.example.com/', 'external': True},
+    {'url': '/wiki/spaces/TEST/pages/1', 'external': False},
+]
+
+
+class TestLinkValidation:
+    """External links are checked on the caller's event loop when there is one"""
+
+    @pytest.fixture
+    def extractor(self):
+        extractor = ContentExtractor()
+        responses = [Mock(status_code=200), Mock(status_code=404)]
+        extractor._ahead_links = AsyncMock(return_value=responses)
+        return extractor
+
+    @pytest.fixture
+    def content(self):
+        return ContentModel(page_url="https://test.atlassian.net/wiki/page", title="Links",
+                            raw_html="", raw_text="", metadata={'structure': {'links': LINKS}})
+
+    @pytest.fixture(autouse=True)
+    def link_checks_enabled(self):
+        with patch.object(extractor_module.settings, 'VALIDATE_EXTERNAL_LINKS', True), \
+                patch.object(extractor_module, '_LINK_STATUS_CACHE', extractor_module.LRUCache(maxsize=16)):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_avalidate_links_sorts_broken_links(self, extractor, content):
+        results = await extractor.avalidate_links(content)
+
+        assert results['external_links'] == 2
+        assert results['internal_links'] == 1
+        assert results['broken_links'] == [LINKS[1]]
+        assert results['valid_links'] == [LINKS[0], LINKS[2]]
+
+    def test_validate_links_without_event_loop(self, extractor, content):
+        results = extractor.validate_links(content)
+
+        assert results['broken_links'] == [LINKS[1]]
+
+    @pytest.mark.asyncio
+    async def test_validate_links_refuses_to_block_running_loop(self, extractor, content):
+        assert extractor.validate_links(content) == {}
+        extractor._ahead_links.assert_not_called()
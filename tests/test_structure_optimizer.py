@@ -0,0 +1,50 @@
+"""
+Tests for splitting long paragraphs without losing their markup
+"""
+import pytest
+from src.ai_engine.structure_optimizer import StructureOptimizer, _SENTENCE_BOUNDARY_RE
+from src.utils.helpers import parse_html
+
+
+def split_at_first_sentence(html: str) -> str:
+    """Split the page's paragraph at its first sentence boundary and return the page"""
+    soup = parse_html(html)
+    p = soup.find('p')
+    boundary = _SENTENCE_BOUNDARY_RE.search(p.get_text())
+    StructureOptimizer()._split_paragraph(soup, p, boundary.start())
+    return soup.body.decode_contents()
+
+
+class TestSplitParagraph:
+    """Splits land on the sentence boundary and keep inline elements intact"""
+
+    def test_split_inside_text_node(self):
+        result = split_at_first_sentence("<p>First sentence. Second <em>sentence</em>.</p>")
+        assert result == "<p>First sentence.</p><p>Second <em>sentence</em>.</p>"
+
+    def test_split_right_after_strong(self):
+        result = split_at_first_sentence("<p>Start with <strong>this step.</strong> Then the next one.</p>")
+        assert result == "<p>Start with <strong>this step.</strong></p><p>Then the next one.</p>"
+
+    def test_split_right_after_link(self):
+        result = split_at_first_sentence(
+            '<p>Read <a href="https://example.com/guide">the guide.</a> It covers <b>setup</b>.</p>'
+        )
+        assert result == (
+            '<p>Read <a href="https://example.com/guide">the guide.</a></p>'
+            '<p>It covers <b>setup</b>.</p>'
+        )
+
+    def test_comment_does_not_shift_the_split(self):
+        result = split_at_first_sentence("<p>Intro<!-- reviewer note --> text. Closing text.</p>")
+        assert result == "<p>Intro<!-- reviewer note --> text.</p><p>Closing text.</p>"
+
+    @pytest.mark.parametrize('html', [
+        "<p>First sentence. Second <em>sentence</em>.</p>",
+        "<p>Start with <strong>this step.</strong> Then the next one.</p>",
+        "<p>Intro<!-- reviewer note --> text. Closing text.</p>",
+    ])
+    def test_no_text_is_lost(self, html):
+        original = parse_html(html).get_text()
+        split = parse_html(split_at_first_sentence(html)).get_text()
+        assert split.replace(' ', '') == original.replace(' ', '')
@@ -0,0 +1,56 @@
+"""
+Tests for serializing generated charts at the API boundary
+"""
+import json
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+from fastapi.encoders import jsonable_encoder
+from src.ai_engine.visualization_engine import VisualizationEngine
+from src.models.content_model import TableData
+from src.models.visualization_model import ChartConfig, DashboardModel, VisualizationModel, VisualizationType
+
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
+
+
+class TestVisualizationSerialization:
+    """Chart data keeps numpy columns in memory but dumps like the figure's own JSON"""
+
+    @pytest.fixture
+    def figure(self):
+        engine = VisualizationEngine()
+        table = TableData(table_id='t1', headers=['month', 'sales'],
+                          rows=[[month, str(index * 3.5)] for index, month in enumerate(MONTHS)])
+        df = engine._get_frame(table).df
+        # Built the way _create_bar_chart builds its trace
+        return go.Figure(go.Bar(x=engine._plot_values(df['month']), y=engine._column_values(df, ['sales'])))
+
+    @pytest.fixture
+    def chart(self, figure):
+        return VisualizationModel(
+            content_id='t1',
+            viz_type=VisualizationType.BAR_CHART,
+            title='Sales by month',
+            description='',
+            config=ChartConfig(chart_type=VisualizationType.BAR_CHART, title='Sales by month'),
+            data=figure.to_plotly_json()
+        )
+
+    def test_data_stays_numpy_in_memory(self, chart):
+        assert isinstance(chart.data['data'][0]['x'], np.ndarray)
+
+    def test_model_dump_json_matches_figure_json(self, chart, figure):
+        data = json.loads(chart.model_dump_json())['data']
+        assert data == json.loads(figure.to_json())
+        assert data['data'][0]['x'] == MONTHS
+
+    def test_model_dump_is_json_serializable(self, chart):
+        assert json.loads(json.dumps(chart.model_dump())) == json.loads(chart.model_dump_json())
+
+    def test_jsonable_encoder(self, chart, figure):
+        assert jsonable_encoder(chart)['data'] == json.loads(figure.to_json())
+
+    def test_dashboard_charts(self, chart, figure):
+        dashboard = DashboardModel(content_id='t1', title='Sales', description='', layout={}, charts=[chart])
+        assert json.loads(dashboard.model_dump_json())['charts'][0]['data'] == json.loads(figure.to_json())